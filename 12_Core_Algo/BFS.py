@@ -0,0 +1,109 @@
+"""
+Breadth-first search over a CSRGraph.
+
+The search is level-synchronous: each step expands the whole frontier with
+array operations, so there is no recursion, no queue of Python objects and
+no per-edge Python work. Narrow frontiers (deep, chain-like graphs) are
+expanded with a scalar loop instead, where per-call NumPy overhead would
+dominate. Any number of source nodes can be given.
+"""
+
+from __future__ import annotations
+
+from typing import Iterable, Iterator
+
+import numpy as np
+
+from csr_graph import SCALAR_LAYER_LIMIT, CSRGraph
+
+
+UNREACHED = -1
+
+
+def _as_sources(graph: CSRGraph, sources: int | Iterable[int] | np.ndarray) -> np.ndarray:
+    sources = np.unique(np.atleast_1d(np.asarray(sources, dtype=np.int64)))
+    if sources.size and (sources[0] < 0 or sources[-1] >= graph.num_nodes):
+        raise IndexError("Source node out of range.")
+    return sources
+
+
+def bfs_levels(
+    graph: CSRGraph,
+    sources: int | Iterable[int] | np.ndarray,
+) -> Iterator[np.ndarray]:
+    """Yield the frontier of each BFS level, starting with the sources."""
+    visited = np.zeros(graph.num_nodes, dtype=bool)
+    frontier = _as_sources(graph, sources)
+    visited[frontier] = True
+    offsets, targets = graph.offsets, graph.targets
+    while len(frontier):
+        yield frontier
+        if len(frontier) < SCALAR_LAYER_LIMIT:
+            reached = []
+            for v in frontier.tolist():
+                for w in targets[offsets[v]:offsets[v + 1]].tolist():
+                    if not visited[w]:
+                        visited[w] = True
+                        reached.append(w)
+            # Sorted, like the frontiers np.unique produces below.
+            reached.sort()
+            frontier = np.array(reached, dtype=frontier.dtype)
+            continue
+        _, reached = graph.expand(frontier)
+        reached = np.unique(reached[~visited[reached]])
+        visited[reached] = True
+        frontier = reached
+
+
+def bfs(
+    graph: CSRGraph,
+    sources: int | Iterable[int] | np.ndarray,
+    max_depth: int | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Multi-source BFS.
+
+    Returns ``(dist, parent)``: hop count from the nearest source and the BFS
+    tree predecessor of every node. Unreached nodes (and sources, for
+    ``parent``) hold ``UNREACHED``.
+    """
+    dtype = graph.targets.dtype
+    dist = np.full(graph.num_nodes, UNREACHED, dtype=dtype)
+    parent = np.full(graph.num_nodes, UNREACHED, dtype=dtype)
+    frontier = _as_sources(graph, sources)
+    dist[frontier] = 0
+    depth = 0
+    offsets, targets = graph.offsets, graph.targets
+    while len(frontier) and (max_depth is None or depth < max_depth):
+        depth += 1
+        if len(frontier) < SCALAR_LAYER_LIMIT:
+            reached = []
+            for v in frontier.tolist():
+                for w in targets[offsets[v]:offsets[v + 1]].tolist():
+                    if dist[w] == UNREACHED:
+                        dist[w] = depth
+                        parent[w] = v
+                        reached.append(w)
+            reached.sort()
+            frontier = np.array(reached, dtype=frontier.dtype)
+            continue
+        src, reached = graph.expand(frontier)
+        fresh = dist[reached] == UNREACHED
+        # Keep the first edge into every newly reached node as its tree edge.
+        reached, first = np.unique(reached[fresh], return_index=True)
+        dist[reached] = depth
+        parent[reached] = src[fresh][first]
+        frontier = reached
+    return dist, parent
+
+
+def shortest_path(graph: CSRGraph, source: int, target: int) -> list[int]:
+    """Fewest-hop path from ``source`` to ``target``; empty if unreachable."""
+    dist, parent = bfs(graph, source)
+    if dist[target] == UNREACHED:
+        return []
+    path = [int(target)]
+    while path[-1] != source:
+        path.append(int(parent[path[-1]]))
+    path.reverse()
+    return path
@@ -0,0 +1,72 @@
+"""
+Binary search primitives.
+
+``lower_bound``/``upper_bound`` work on any sorted sequence one query at a
+time. The array helpers answer whole batches with ``np.searchsorted`` and are
+the building blocks for the interval index in mergeintervals.py.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Optional, Sequence
+
+import numpy as np
+
+
+def lower_bound(seq: Sequence[Any], x: Any, lo: int = 0, hi: Optional[int] = None) -> int:
+    """First index in ``seq[lo:hi]`` whose value is not less than ``x``."""
+    if hi is None:
+        hi = len(seq)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if seq[mid] < x:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+def upper_bound(seq: Sequence[Any], x: Any, lo: int = 0, hi: Optional[int] = None) -> int:
+    """First index in ``seq[lo:hi]`` whose value is greater than ``x``."""
+    if hi is None:
+        hi = len(seq)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if x < seq[mid]:
+            hi = mid
+        else:
+            lo = mid + 1
+    return lo
+
+
+def binary_search(seq: Sequence[Any], x: Any) -> int:
+    """Index of ``x`` in sorted ``seq``, or -1 if it is absent."""
+    i = lower_bound(seq, x)
+    return i if i < len(seq) and seq[i] == x else -1
+
+
+def count_in_range(sorted_values: np.ndarray, lo: Any, hi: Any) -> np.ndarray:
+    """Number of values in the closed range ``[lo, hi]``, for each (lo, hi) pair."""
+    return (
+        np.searchsorted(sorted_values, hi, side="right")
+        - np.searchsorted(sorted_values, lo, side="left")
+    )
+
+
+def merge_sorted(a: np.ndarray, b: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Merge two sorted arrays without re-sorting.
+
+    Returns ``(merged, take)`` where ``take`` indexes into
+    ``np.concatenate([a, b])``, so arrays aligned with ``a`` and ``b`` can be
+    merged the same way. Equal keys from ``b`` are placed after those from
+    ``a``.
+    """
+    na, nb = len(a), len(b)
+    dest_b = np.searchsorted(a, b, side="right") + np.arange(nb)
+    from_b = np.zeros(na + nb, dtype=bool)
+    from_b[dest_b] = True
+    take = np.empty(na + nb, dtype=np.int64)
+    take[dest_b] = np.arange(na, na + nb)
+    take[~from_b] = np.arange(na)
+    return np.concatenate([a, b])[take], take
@@ -0,0 +1,82 @@
+"""
+Depth-first search over a CSRGraph.
+
+The traversal is iterative: an explicit stack of node ids plus a per-node
+cursor into the CSR target array replaces recursion, so depth is limited only
+by memory. All state lives in preallocated NumPy arrays.
+"""
+
+from __future__ import annotations
+
+from typing import Iterable, Optional
+
+import numpy as np
+
+from csr_graph import CSRGraph
+
+
+UNREACHED = -1
+
+
+def dfs(
+    graph: CSRGraph,
+    sources: Optional[int | Iterable[int] | np.ndarray] = None,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Iterative DFS from ``sources`` (every node, in id order, when omitted).
+
+    Returns ``(preorder, postorder, parent)``. The order arrays list node ids
+    in discovery and finish order; ``parent`` holds the DFS tree predecessor
+    of every node, or ``UNREACHED`` for roots and unvisited nodes.
+    """
+    n = graph.num_nodes
+    dtype = graph.targets.dtype
+    offsets = graph.offsets
+    targets = graph.targets
+
+    if sources is None:
+        roots = range(n)
+    else:
+        roots = np.atleast_1d(np.asarray(sources, dtype=np.int64))
+        if roots.size and (roots.min() < 0 or roots.max() >= n):
+            raise IndexError("Source node out of range.")
+
+    visited = np.zeros(n, dtype=bool)
+    cursor = np.array(offsets[:-1], dtype=np.int64)
+    parent = np.full(n, UNREACHED, dtype=dtype)
+    stack = np.empty(n, dtype=np.int64)
+    preorder = np.empty(n, dtype=dtype)
+    postorder = np.empty(n, dtype=dtype)
+    pre_count = post_count = 0
+
+    for root in roots:
+        root = int(root)
+        if visited[root]:
+            continue
+        visited[root] = True
+        preorder[pre_count] = root
+        pre_count += 1
+        stack[0] = root
+        top = 1
+        while top:
+            v = int(stack[top - 1])
+            pos = int(cursor[v])
+            end = int(offsets[v + 1])
+            while pos < end and visited[targets[pos]]:
+                pos += 1
+            if pos < end:
+                w = int(targets[pos])
+                cursor[v] = pos + 1
+                visited[w] = True
+                parent[w] = v
+                preorder[pre_count] = w
+                pre_count += 1
+                stack[top] = w
+                top += 1
+            else:
+                cursor[v] = end
+                postorder[post_count] = v
+                post_count += 1
+                top -= 1
+
+    return preorder[:pre_count], postorder[:post_count], parent
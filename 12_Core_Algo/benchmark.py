@@ -0,0 +1,561 @@
+#!/usr/bin/env python3
+"""
+Benchmark and regression harness for the 12_Core_Algo modules.
+
+Every ``.py`` file in this directory is loaded and its public functions and
+classes are listed as entry points. Entry points with a registered synthetic
+input case are timed at half-decade sizes (10^3, 3*10^3, 10^4, ...) up to
+10^7 (capped per case), so even capped cases get enough points to fit; their
+peak memory is measured with tracemalloc, and an empirical complexity class
+is fitted to the timings. Results can be saved as a JSON baseline and later
+runs compared against it to flag regressions.
+
+Setup:
+    pip install numpy
+
+Usage:
+    # Every module, printing a report
+    python benchmark.py
+
+    # One module, smaller sizes
+    python benchmark.py union-find --max-exp 5
+
+    # Record a baseline, then check a later run against it
+    python benchmark.py --save-baseline baseline.json
+    python benchmark.py --baseline baseline.json --threshold 0.25
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import inspect
+import json
+import math
+import pathlib
+import platform
+import sys
+import time
+import tracemalloc
+from types import ModuleType
+from typing import Callable, Iterable, NamedTuple, Optional
+
+import numpy as np
+
+
+ALGO_DIR = pathlib.Path(__file__).resolve().parent
+HARNESS_NAME = pathlib.Path(__file__).stem
+DEFAULT_THRESHOLD = 0.25
+DEFAULT_BUDGET = 10.0
+DEFAULT_REPEAT = 3
+# CLI plumbing that every script here has; never an algorithm entry point.
+IGNORED_ENTRY_POINTS = {"main", "parse_args"}
+# Differences smaller than these are measurement noise, not regressions.
+MIN_REGRESSION_SECONDS = 1e-3
+MIN_REGRESSION_BYTES = 1 << 20
+# Metrics compared against a baseline, with their noise floors.
+REGRESSION_METRICS = {"seconds": MIN_REGRESSION_SECONDS, "peak_bytes": MIN_REGRESSION_BYTES}
+
+COMPLEXITY_MODELS: dict[str, Callable[[np.ndarray], np.ndarray]] = {
+    "O(1)": lambda n: np.ones_like(n),
+    "O(log n)": lambda n: np.log2(n),
+    "O(n)": lambda n: n,
+    "O(n log n)": lambda n: n * np.log2(n),
+    "O(n^2)": lambda n: n ** 2,
+}
+
+
+class Case(NamedTuple):
+    module: str
+    entry: str
+    setup: Callable[[ModuleType, int, np.random.Generator], Callable[[], object]]
+    max_exp: int
+
+    @property
+    def key(self) -> str:
+        return f"{self.module}:{self.entry}"
+
+
+CASES: list[Case] = []
+
+
+def case(module: str, entry: str, max_exp: int = 7) -> Callable:
+    """
+    Register a synthetic input for ``module:entry``.
+
+    The decorated function receives the loaded module, the input size and a
+    seeded generator, and returns a zero-argument callable to time. Setup
+    work done outside that callable is not timed.
+    """
+
+    def decorator(setup: Callable) -> Callable:
+        CASES.append(Case(module, entry, setup, max_exp))
+        return setup
+
+    return decorator
+
+
+def _random_string(rng: np.random.Generator, n: int, alphabet: int = 26) -> str:
+    return "".join(map(chr, (97 + rng.integers(0, alphabet, n)).tolist()))
+
+
+def _random_dag_edges(rng: np.random.Generator, n: int) -> np.ndarray:
+    edges = rng.integers(0, n, size=(2 * n, 2))
+    edges.sort(axis=1)
+    return edges[edges[:, 0] != edges[:, 1]]
+
+
+@case("union-find", "DisjointSet.union_many")
+def _union_many(mod: ModuleType, n: int, rng: np.random.Generator) -> Callable:
+    edges = mod.random_edges(n, n, seed=int(rng.integers(1 << 31)))
+    return lambda: mod.DisjointSet(n).union_many(edges)
+
+
+@case("union-find", "DisjointSet.labels")
+def _labels(mod: ModuleType, n: int, rng: np.random.Generator) -> Callable:
+    dsu = mod.DisjointSet(n)
+    dsu.union_many(mod.random_edges(n, n, seed=int(rng.integers(1 << 31))))
+    return dsu.labels
+
+
+@case("csr_graph", "CSRGraph.from_edges")
+def _from_edges(mod: ModuleType, n: int, rng: np.random.Generator) -> Callable:
+    edges = rng.integers(0, n, size=(2 * n, 2))
+    return lambda: mod.CSRGraph.from_edges(n, edges)
+
+
+@case("BFS", "bfs")
+def _bfs(mod: ModuleType, n: int, rng: np.random.Generator) -> Callable:
+    graph = mod.CSRGraph.from_edges(n, rng.integers(0, n, size=(2 * n, 2)), directed=False)
+    return lambda: mod.bfs(graph, 0)
+
+
+@case("DFS", "dfs", max_exp=6)
+def _dfs(mod: ModuleType, n: int, rng: np.random.Generator) -> Callable:
+    graph = mod.CSRGraph.from_edges(n, rng.integers(0, n, size=(2 * n, 2)))
+    return lambda: mod.dfs(graph)
+
+
+@case("topological_sort", "topological_sort")
+def _topological_sort(mod: ModuleType, n: int, rng: np.random.Generator) -> Callable:
+    graph = mod.CSRGraph.from_edges(n, _random_dag_edges(rng, n))
+    return lambda: mod.topological_sort(graph)
+
+
+@case("BinarySearch", "count_in_range")
+def _count_in_range(mod: ModuleType, n: int, rng: np.random.Generator) -> Callable:
+    values = np.sort(rng.random(n))
+    lo = rng.random(n)
+    hi = lo + 0.01
+    return lambda: mod.count_in_range(values, lo, hi)
+
+
+@case("BinarySearch", "merge_sorted")
+def _merge_sorted(mod: ModuleType, n: int, rng: np.random.Generator) -> Callable:
+    a = np.sort(rng.random(n // 2))
+    b = np.sort(rng.random(n - n // 2))
+    return lambda: mod.merge_sorted(a, b)
+
+
+@case("mergeintervals", "merge_intervals")
+def _merge_intervals(mod: ModuleType, n: int, rng: np.random.Generator) -> Callable:
+    starts = rng.integers(0, 10 * n, n)
+    ends = starts + rng.integers(0, 20, n)
+    return lambda: mod.merge_intervals(starts, ends)
+
+
+@case("mergeintervals", "IntervalIndex.count_stabbing")
+def _count_stabbing(mod: ModuleType, n: int, rng: np.random.Generator) -> Callable:
+    starts = rng.integers(0, 10 * n, n)
+    index = mod.IntervalIndex(starts, starts + rng.integers(0, 20, n))
+    points = rng.integers(0, 10 * n, n)
+    return lambda: index.count_stabbing(points)
+
+
+def _nanosecond_spans(rng: np.random.Generator, n: int) -> tuple[np.ndarray, np.ndarray]:
+    # Epoch nanoseconds are past 2^53, so any float64 round trip loses them.
+    starts = 1_700_000_000_000_000_000 + rng.integers(0, 10 ** 12, n)
+    return starts, starts + rng.integers(1, 10 ** 6, n)
+
+
+@case("mergeintervals", "IntervalIndex.add", max_exp=6)
+def _interval_add(mod: ModuleType, n: int, rng: np.random.Generator) -> Callable:
+    starts, ends = _nanosecond_spans(rng, n)
+
+    def run() -> None:
+        index = mod.IntervalIndex()
+        for start, end in zip(starts.tolist(), ends.tolist()):
+            index.add(start, end)
+
+    return run
+
+
+@case("mergeintervals", "IntervalIndex.extend")
+def _interval_extend(mod: ModuleType, n: int, rng: np.random.Generator) -> Callable:
+    starts, ends = _nanosecond_spans(rng, n)
+    starts, ends = starts.astype("datetime64[ns]"), ends.astype("datetime64[ns]")
+    batches = np.arange(0, n, 1000)
+
+    def run() -> None:
+        index = mod.IntervalIndex()
+        for lo in batches.tolist():
+            index.extend(starts[lo:lo + 1000], ends[lo:lo + 1000])
+
+    return run
+
+
+@case("mono_stackandqueue", "next_greater", max_exp=6)
+def _next_greater(mod: ModuleType, n: int, rng: np.random.Generator) -> Callable:
+    values = rng.random(n)
+    return lambda: mod.next_greater(values)
+
+
+@case("slidingwindow", "SlidingWindow.consume", max_exp=6)
+def _consume(mod: ModuleType, n: int, rng: np.random.Generator) -> Callable:
+    values = rng.random(n).tolist()
+    return lambda: sum(1 for _ in mod.SlidingWindow(size=100).consume(values))
+
+
+@case("slidingwindow", "rolling")
+def _rolling(mod: ModuleType, n: int, rng: np.random.Generator) -> Callable:
+    values = rng.random(n)
+    return lambda: mod.rolling(values, 100, "max")
+
+
+@case("slidingwindow", "rolling_time")
+def _rolling_time(mod: ModuleType, n: int, rng: np.random.Generator) -> Callable:
+    timestamps = np.cumsum(rng.random(n))
+    values = rng.random(n)
+    return lambda: mod.rolling_time(timestamps, values, 50.0, "max")
+
+
+@case("dynamic_programing", "edit_distance", max_exp=4)
+def _edit_distance(mod: ModuleType, n: int, rng: np.random.Generator) -> Callable:
+    a, b = _random_string(rng, n), _random_string(rng, n)
+    return lambda: mod.edit_distance(a, b)
+
+
+@case("dynamic_programing", "lcs_length", max_exp=4)
+def _lcs_length(mod: ModuleType, n: int, rng: np.random.Generator) -> Callable:
+    a, b = _random_string(rng, n), _random_string(rng, n)
+    return lambda: mod.lcs_length(a, b)
+
+
+@case("dynamic_programing", "knapsack", max_exp=5)
+def _knapsack(mod: ModuleType, n: int, rng: np.random.Generator) -> Callable:
+    weights = rng.integers(1, 100, n)
+    values = rng.integers(1, 1000, n)
+    return lambda: mod.knapsack(weights, values, 1000)
+
+
+@case("dynamic_programing", "fuzzy_match", max_exp=5)
+def _fuzzy_match(mod: ModuleType, n: int, rng: np.random.Generator) -> Callable:
+    candidates = [_random_string(rng, int(k), alphabet=8) for k in rng.integers(15, 40, n)]
+    query = candidates[0]
+    return lambda: mod.fuzzy_match(query, candidates, 3)
+
+
+def module_paths() -> dict[str, pathlib.Path]:
+    return {
+        path.stem: path
+        for path in sorted(ALGO_DIR.glob("*.py"))
+        if path.stem != HARNESS_NAME
+    }
+
+
+def load_module(path: pathlib.Path) -> ModuleType:
+    # File names such as "union-find" are not valid identifiers, so modules
+    # are loaded by path. The directory goes on sys.path for sibling imports.
+    if str(ALGO_DIR) not in sys.path:
+        sys.path.insert(0, str(ALGO_DIR))
+    name = path.stem.replace("-", "_")
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def entry_points(module: ModuleType) -> list[str]:
+    """Public functions and classes defined in ``module`` itself."""
+    return [
+        name
+        for name, obj in vars(module).items()
+        if not name.startswith("_")
+        and name not in IGNORED_ENTRY_POINTS
+        and (inspect.isfunction(obj) or inspect.isclass(obj))
+        and obj.__module__ == module.__name__
+    ]
+
+
+def time_call(run: Callable[[], object], repeat: int) -> float:
+    # One untimed call first, so imports, caches and allocator growth are
+    # not charged to the first timed run.
+    run()
+    best = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def peak_memory(run: Callable[[], object]) -> int:
+    # Measured in a separate call: tracemalloc slows pure-Python code down
+    # enough to distort the timings.
+    tracemalloc.start()
+    try:
+        run()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def fit_complexity(sizes: Iterable[int], seconds: Iterable[float]) -> dict:
+    """Pick the complexity model that best explains the timings in log space."""
+    n = np.asarray(list(sizes), dtype=float)
+    t = np.asarray(list(seconds), dtype=float)
+    usable = t > 0
+    n, t = n[usable], t[usable]
+    if len(n) < 3:
+        return {"complexity": None, "exponent": None}
+    log_t = np.log(t)
+    best_name, best_error = None, math.inf
+    for name, model in COMPLEXITY_MODELS.items():
+        residual = log_t - np.log(model(n))
+        error = float(np.var(residual))
+        if error < best_error:
+            best_name, best_error = name, error
+    exponent = float(np.polyfit(np.log(n), log_t, 1)[0])
+    return {"complexity": best_name, "exponent": round(exponent, 3)}
+
+
+def sizes(min_exp: int, max_exp: int) -> list[int]:
+    """Half-decade sizes from 10^min_exp to 10^max_exp: 10^3, 3162, 10^4, ..."""
+    return [round(10 ** (half / 2)) for half in range(2 * min_exp, 2 * max_exp + 1)]
+
+
+def run_case(
+    bench: Case,
+    module: ModuleType,
+    min_exp: int,
+    max_exp: int,
+    repeat: int,
+    budget: float,
+    seed: int,
+) -> dict:
+    runs = []
+    for n in sizes(min_exp, min(max_exp, bench.max_exp)):
+        run = bench.setup(module, n, np.random.default_rng(seed))
+        seconds = time_call(run, repeat)
+        runs.append({"n": n, "seconds": seconds, "peak_bytes": peak_memory(run)})
+        if seconds > budget:
+            break
+    fit = fit_complexity([r["n"] for r in runs], [r["seconds"] for r in runs])
+    return {**fit, "runs": runs}
+
+
+def select_modules(paths: dict[str, pathlib.Path], modules: Optional[Iterable[str]]) -> list[str]:
+    selected = list(modules) if modules else list(paths)
+    unknown = [name for name in selected if name not in paths]
+    if unknown:
+        raise SystemExit(f"Unknown module(s): {', '.join(unknown)}")
+    return selected
+
+
+def run_benchmarks(
+    modules: Optional[Iterable[str]] = None,
+    min_exp: int = 3,
+    max_exp: int = 7,
+    repeat: int = DEFAULT_REPEAT,
+    budget: float = DEFAULT_BUDGET,
+    seed: int = 0,
+    report: Callable[[str], None] = print,
+) -> dict:
+    paths = module_paths()
+    selected = select_modules(paths, modules)
+    results: dict[str, dict] = {}
+    for name in selected:
+        module = load_module(paths[name])
+        cases = [c for c in CASES if c.module == name]
+        covered = {c.entry.split(".")[0] for c in cases}
+        uncovered = [entry for entry in entry_points(module) if entry not in covered]
+        if not cases:
+            report(f"{name}: no benchmark cases ({len(uncovered)} entry points)")
+            continue
+        for bench in cases:
+            results[bench.key] = run_case(bench, module, min_exp, max_exp, repeat, budget, seed)
+            report(format_result(bench.key, results[bench.key]))
+        if uncovered:
+            report(f"{name}: not benchmarked: {', '.join(uncovered)}")
+    return {"meta": environment(), "results": results}
+
+
+def environment() -> dict:
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "system": platform.system(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def format_result(key: str, result: dict) -> str:
+    lines = [f"{key}  {result['complexity'] or 'n/a'}  (exponent {result['exponent']})"]
+    for run in result["runs"]:
+        lines.append(
+            f"    n={run['n']:>10}  {run['seconds']:>10.4f}s  "
+            f"{run['peak_bytes'] / 2 ** 20:>9.1f} MiB"
+        )
+    return "\n".join(lines)
+
+
+def find_regressions(current: dict, baseline: dict, threshold: float) -> list[dict]:
+    """
+    Runs that got slower, or used more peak memory, than ``baseline`` by more
+    than ``threshold`` (0.25 = 25%).
+    """
+    regressions = []
+    for key, result in current["results"].items():
+        previous = baseline.get("results", {}).get(key)
+        if not previous:
+            continue
+        previous_runs = {run["n"]: run for run in previous["runs"]}
+        for run in result["runs"]:
+            base = previous_runs.get(run["n"])
+            if not base:
+                continue
+            for metric, noise in REGRESSION_METRICS.items():
+                if metric not in base:
+                    continue
+                grown = run[metric] - base[metric]
+                if run[metric] > base[metric] * (1 + threshold) and grown > noise:
+                    regressions.append(
+                        {
+                            "key": key,
+                            "n": run["n"],
+                            "metric": metric,
+                            "baseline": base[metric],
+                            "current": run[metric],
+                            "ratio": run[metric] / base[metric] if base[metric] else math.inf,
+                        }
+                    )
+    return regressions
+
+
+def format_metric(metric: str, value: float) -> str:
+    return f"{value:.4f}s" if metric == "seconds" else f"{value / 2 ** 20:.1f} MiB"
+
+
+def parse_args(argv: Optional[Iterable[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Benchmark the 12_Core_Algo modules and check for regressions."
+    )
+    parser.add_argument(
+        "modules",
+        nargs="*",
+        help="Module names to run, e.g. union-find BFS (default: all)",
+    )
+    parser.add_argument(
+        "--list",
+        action="store_true",
+        help="List modules, entry points and benchmark cases, then exit",
+    )
+    parser.add_argument(
+        "--min-exp",
+        type=int,
+        default=3,
+        help="Smallest size as a power of ten; sizes step by half decades (default: 3)",
+    )
+    parser.add_argument(
+        "--max-exp",
+        type=int,
+        default=7,
+        help="Largest size as a power of ten, capped per case (default: 7)",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=DEFAULT_REPEAT,
+        help="Timed runs per size; the fastest is kept (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=DEFAULT_BUDGET,
+        help="Stop growing a case once one run takes longer than this many seconds "
+        "(default: %(default)s)",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="Seed for the synthetic inputs (default: 0)",
+    )
+    parser.add_argument(
+        "--save-baseline",
+        type=pathlib.Path,
+        help="Write results to this JSON file",
+    )
+    parser.add_argument(
+        "--baseline",
+        type=pathlib.Path,
+        help="Compare against this JSON baseline and exit non-zero on regressions",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="Allowed slowdown before a run counts as a regression (default: %(default)s)",
+    )
+    return parser.parse_args(argv)
+
+
+def list_entry_points(modules: Iterable[str]) -> None:
+    paths = module_paths()
+    for name in select_modules(paths, modules):
+        module = load_module(paths[name])
+        cases = [c.entry for c in CASES if c.module == name]
+        print(f"{name}: {', '.join(entry_points(module)) or '(none)'}")
+        for entry in cases:
+            print(f"    case {entry}")
+
+
+def main(argv: Optional[Iterable[str]] = None) -> None:
+    args = parse_args(argv)
+    if args.list:
+        list_entry_points(args.modules)
+        return
+
+    current = run_benchmarks(
+        modules=args.modules,
+        min_exp=args.min_exp,
+        max_exp=args.max_exp,
+        repeat=args.repeat,
+        budget=args.budget,
+        seed=args.seed,
+    )
+
+    if args.save_baseline:
+        args.save_baseline.write_text(json.dumps(current, indent=2))
+        print(f"Saved baseline to {args.save_baseline}")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        regressions = find_regressions(current, baseline, args.threshold)
+        for item in regressions:
+            print(
+                f"REGRESSION {item['key']} n={item['n']} {item['metric']}: "
+                f"{format_metric(item['metric'], item['baseline'])} -> "
+                f"{format_metric(item['metric'], item['current'])} ({item['ratio']:.2f}x)"
+            )
+        if regressions:
+            raise SystemExit(1)
+        print(f"No regressions beyond {args.threshold:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
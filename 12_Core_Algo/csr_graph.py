@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Compressed-sparse-row graph shared by BFS.py, DFS.py and topological_sort.py.
+
+A graph with ``n`` nodes and ``m`` edges is stored as two flat arrays:
+``offsets`` (length ``n + 1``) and ``targets`` (length ``m``). The out-edges of
+node ``v`` are ``targets[offsets[v]:offsets[v + 1]]``. Graphs are built in bulk
+from edge arrays and can be saved to a directory of ``.npy`` files and
+memory-mapped back, so graphs with tens of millions of edges never become
+Python objects.
+
+Setup:
+    pip install numpy
+
+Usage:
+    # Convert an edge list (.npy of shape (m, 2) or whitespace-separated text)
+    python csr_graph.py edges.txt graph_dir --undirected
+"""
+
+from __future__ import annotations
+
+import argparse
+import pathlib
+from typing import Iterable, Optional
+
+import numpy as np
+
+
+OFFSETS_FILE = "offsets.npy"
+TARGETS_FILE = "targets.npy"
+INT32_LIMIT = np.iinfo(np.int32).max
+# Frontiers narrower than this are advanced with a scalar loop by BFS.py and
+# topological_sort.py; below it, per-call NumPy overhead dominates.
+SCALAR_LAYER_LIMIT = 64
+
+
+def index_dtype(n: int) -> np.dtype:
+    return np.dtype(np.int32) if n <= INT32_LIMIT else np.dtype(np.int64)
+
+
+def ranges(lo: np.ndarray, hi: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Concatenate ``arange(lo[i], hi[i])`` for all i, with the owning i of each entry."""
+    counts = np.maximum(hi - lo, 0)
+    owner = np.repeat(np.arange(len(lo)), counts)
+    # Each run starts at its lo and counts up by one, laid end to end
+    # without a Python loop.
+    run_starts = np.cumsum(counts) - counts
+    positions = np.arange(int(counts.sum()), dtype=np.int64) + np.repeat(lo - run_starts, counts)
+    return owner, positions
+
+
+class CSRGraph:
+    """Directed graph in compressed-sparse-row form."""
+
+    def __init__(self, offsets: np.ndarray, targets: np.ndarray):
+        if offsets.ndim != 1 or len(offsets) == 0:
+            raise ValueError("Offsets must be a non-empty 1-D array.")
+        if offsets[0] != 0 or offsets[-1] != len(targets):
+            raise ValueError("Offsets do not match the target array.")
+        self.offsets = offsets
+        self.targets = targets
+
+    @classmethod
+    def from_edges(
+        cls,
+        n: int,
+        edges: Iterable[tuple[int, int]] | np.ndarray,
+        directed: bool = True,
+    ) -> "CSRGraph":
+        """Build a graph on ``n`` nodes from an ``(m, 2)`` array of edges."""
+        edges = np.asarray(edges).reshape(-1, 2)
+        if edges.size and (edges.min() < 0 or edges.max() >= n):
+            raise IndexError("Edge endpoint out of range.")
+        dtype = index_dtype(n)
+        src = edges[:, 0].astype(dtype, copy=False)
+        dst = edges[:, 1].astype(dtype, copy=False)
+        if not directed:
+            src, dst = np.concatenate([src, dst]), np.concatenate([dst, src])
+
+        order = np.argsort(src, kind="stable")
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=n), out=offsets[1:])
+        return cls(offsets, dst[order])
+
+    @classmethod
+    def load(cls, directory: str | pathlib.Path, mmap: bool = True) -> "CSRGraph":
+        """Load a graph written by ``save``; memory-mapped read-only by default."""
+        directory = pathlib.Path(directory)
+        mode = "r" if mmap else None
+        offsets = np.load(directory / OFFSETS_FILE, mmap_mode=mode)
+        targets = np.load(directory / TARGETS_FILE, mmap_mode=mode)
+        return cls(offsets, targets)
+
+    def save(self, directory: str | pathlib.Path) -> pathlib.Path:
+        directory = pathlib.Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        np.save(directory / OFFSETS_FILE, self.offsets)
+        np.save(directory / TARGETS_FILE, self.targets)
+        return directory
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.targets)
+
+    def neighbors(self, v: int) -> np.ndarray:
+        return self.targets[self.offsets[v]:self.offsets[v + 1]]
+
+    def out_degree(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+    def in_degree(self) -> np.ndarray:
+        return np.bincount(self.targets, minlength=self.num_nodes)
+
+    def sources(self) -> np.ndarray:
+        """Source node of every edge, aligned with ``targets``."""
+        return np.repeat(
+            np.arange(self.num_nodes, dtype=self.targets.dtype),
+            self.out_degree(),
+        )
+
+    def reverse(self) -> "CSRGraph":
+        """Graph with every edge flipped."""
+        edges = np.column_stack([self.targets, self.sources()])
+        return CSRGraph.from_edges(self.num_nodes, edges)
+
+    def expand(self, frontier: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Gather all out-edges of ``frontier`` as ``(sources, targets)`` arrays."""
+        frontier = np.asarray(frontier, dtype=np.int64)
+        owner, positions = ranges(self.offsets[frontier], self.offsets[frontier + 1])
+        return frontier[owner].astype(self.targets.dtype), self.targets[positions]
+
+
+def read_edges(path: pathlib.Path) -> np.ndarray:
+    if path.suffix == ".npy":
+        return np.load(path, mmap_mode="r")
+    return np.loadtxt(path, dtype=np.int64, ndmin=2)
+
+
+def parse_args(argv: Optional[Iterable[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Convert an edge list into a memory-mappable CSR graph."
+    )
+    parser.add_argument(
+        "edges",
+        type=pathlib.Path,
+        help="Edge list: .npy of shape (m, 2) or whitespace-separated text",
+    )
+    parser.add_argument(
+        "output",
+        type=pathlib.Path,
+        help="Directory to write offsets.npy and targets.npy into",
+    )
+    parser.add_argument(
+        "--nodes",
+        type=int,
+        default=None,
+        help="Node count (default: largest endpoint + 1)",
+    )
+    parser.add_argument(
+        "--undirected",
+        action="store_true",
+        help="Store every edge in both directions",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Iterable[str]] = None) -> None:
+    args = parse_args(argv)
+    edges = read_edges(args.edges)
+    n = args.nodes if args.nodes is not None else int(edges.max()) + 1 if edges.size else 0
+    graph = CSRGraph.from_edges(n, edges, directed=not args.undirected)
+    graph.save(args.output)
+    print(f"Wrote {graph.num_nodes} nodes and {graph.num_edges} edges to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
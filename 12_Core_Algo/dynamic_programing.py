@@ -0,0 +1,241 @@
+"""
+Dynamic programming toolkit.
+
+``memoize`` is a bounded, LRU-evicting memoization decorator for top-down
+solutions that reports hits, misses and evictions. The tabulation kernels
+(edit distance, LCS, 0/1 knapsack) keep only one row of the table, sized by
+the shorter input, and compute each row with NumPy instead of a Python loop
+over cells. ``edit_distance_within`` and ``fuzzy_match`` add a distance
+bound with early exit for fuzzy-matching titles or nicknames in bulk.
+"""
+
+from __future__ import annotations
+
+import functools
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+
+DEFAULT_MAXSIZE = 1024
+PAD = -1
+
+
+class CacheStats(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    maxsize: Optional[int]
+
+
+def memoize(maxsize: Optional[int] = DEFAULT_MAXSIZE) -> Callable[[Callable], Callable]:
+    """
+    Memoize a function on its (hashable) arguments with LRU eviction.
+
+    ``maxsize=None`` disables eviction. The wrapped function gains
+    ``cache_stats()`` and ``cache_clear()``.
+    """
+    if maxsize is not None and maxsize <= 0:
+        raise ValueError("maxsize must be a positive integer or None.")
+
+    def decorator(func: Callable) -> Callable:
+        cache: OrderedDict[Hashable, Any] = OrderedDict()
+        counters = {"hits": 0, "misses": 0, "evictions": 0}
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            key = (args, tuple(sorted(kwargs.items()))) if kwargs else args
+            if key in cache:
+                counters["hits"] += 1
+                cache.move_to_end(key)
+                return cache[key]
+            counters["misses"] += 1
+            result = func(*args, **kwargs)
+            cache[key] = result
+            if maxsize is not None and len(cache) > maxsize:
+                cache.popitem(last=False)
+                counters["evictions"] += 1
+            return result
+
+        def cache_stats() -> CacheStats:
+            return CacheStats(
+                counters["hits"], counters["misses"], counters["evictions"], len(cache), maxsize
+            )
+
+        def cache_clear() -> None:
+            cache.clear()
+            for name in counters:
+                counters[name] = 0
+
+        wrapper.cache_stats = cache_stats
+        wrapper.cache_clear = cache_clear
+        return wrapper
+
+    return decorator
+
+
+def _encode(seq: Sequence[Any] | str) -> np.ndarray:
+    """Turn a string or sequence into a 1-D array of comparable codes."""
+    if isinstance(seq, str):
+        return np.frombuffer(seq.encode("utf-32-le"), dtype="<u4").astype(np.int64)
+    return np.asarray(seq)
+
+
+def _shorter_last(a: Sequence[Any] | str, b: Sequence[Any] | str) -> tuple[np.ndarray, np.ndarray]:
+    # Rows run over the longer input so the kept row is sized by the shorter one.
+    a, b = _encode(a), _encode(b)
+    return (a, b) if len(a) >= len(b) else (b, a)
+
+
+def edit_distance(a: Sequence[Any] | str, b: Sequence[Any] | str) -> int:
+    """Levenshtein distance in O(min(n, m)) memory."""
+    a, b = _shorter_last(a, b)
+    m = len(b)
+    cols = np.arange(m + 1)
+    row = cols.copy()
+    for i, ch in enumerate(a, start=1):
+        # Substitution and deletion only depend on the previous row...
+        step = np.empty(m + 1, dtype=np.int64)
+        step[0] = i
+        step[1:] = np.minimum(row[1:] + 1, row[:-1] + (b != ch))
+        # ...and insertions chain left to right: cur[j] = min_k step[k] + (j - k).
+        row = np.minimum.accumulate(step - cols) + cols
+    return int(row[m])
+
+
+def edit_distance_within(
+    a: Sequence[Any] | str,
+    b: Sequence[Any] | str,
+    max_distance: int,
+) -> Optional[int]:
+    """
+    Levenshtein distance if it is at most ``max_distance``, else ``None``.
+
+    Only the diagonal band of width ``2 * max_distance + 1`` is computed, in
+    two reused buffers indexed by diagonal ``j - i``, so the work is
+    O(n * max_distance). The scan stops as soon as a whole band row exceeds
+    the bound.
+    """
+    if max_distance < 0:
+        raise ValueError("max_distance must be non-negative.")
+    a, b = _shorter_last(a, b)
+    n, m = len(a), len(b)
+    if n - m > max_distance:
+        return None
+    k = max_distance
+    over = k + 1
+    # Slot p holds diagonal p - k - 1; slots 0 and 2k + 2 stay at `over` so
+    # reads just outside the band need no bounds checks.
+    width = 2 * k + 3
+    offsets = np.arange(width)
+    prev = np.full(width, over, dtype=np.int64)
+    prev[k + 1:k + 2 + min(m, k)] = np.arange(min(m, k) + 1)
+    cur = np.empty(width, dtype=np.int64)
+    for i in range(1, n + 1):
+        cur.fill(over)
+        lo, hi = max(0, i - k), min(m, i + k)
+        first, last = lo - i + k + 1, hi - i + k + 1
+        if lo == 0:
+            cur[first] = i
+        start = max(lo, 1)
+        if start <= hi:
+            p = start - i + k + 1
+            # Deletion reads diagonal d + 1 of the previous row, substitution
+            # the same diagonal; insertions chain along the row as before.
+            step = np.minimum(
+                prev[p + 1:last + 2] + 1, prev[p:last + 1] + (b[start - 1:hi] != a[i - 1])
+            )
+            chain = np.concatenate([cur[p - 1:p], step]) - offsets[:len(step) + 1]
+            band = np.minimum.accumulate(chain) + offsets[:len(step) + 1]
+            cur[p:last + 1] = np.minimum(band[1:], over)
+        if cur[first:last + 1].min() > k:
+            return None
+        prev, cur = cur, prev
+    distance = int(prev[m - n + k + 1])
+    return distance if distance <= k else None
+
+
+def fuzzy_match(
+    query: Sequence[Any] | str,
+    candidates: Sequence[Sequence[Any] | str],
+    max_distance: int,
+) -> list[tuple[int, int]]:
+    """
+    Match ``query`` against many candidates at once.
+
+    Returns ``(index, distance)`` for every candidate within ``max_distance``,
+    sorted by distance then index. Candidates are padded into one matrix and
+    the DP advances over the query, one vectorized row for all of them.
+    """
+    if max_distance < 0:
+        raise ValueError("max_distance must be non-negative.")
+    q = _encode(query)
+    encoded = [_encode(c) for c in candidates]
+    lengths = np.array([len(c) for c in encoded], dtype=np.int64)
+    alive = np.flatnonzero(np.abs(lengths - len(q)) <= max_distance)
+    if not len(alive):
+        return []
+
+    width = int(lengths[alive].max())
+    grid = np.full((len(alive), width), PAD, dtype=np.int64)
+    for r, idx in enumerate(alive):
+        grid[r, :lengths[idx]] = encoded[idx]
+    ends = lengths[alive]
+
+    over = max_distance + 1
+    cols = np.arange(width + 1)
+    rows = np.broadcast_to(np.minimum(cols, over), (len(alive), width + 1)).copy()
+    for i, ch in enumerate(q, start=1):
+        step = np.empty_like(rows)
+        step[:, 0] = i
+        step[:, 1:] = np.minimum(rows[:, 1:] + 1, rows[:, :-1] + (grid != ch))
+        rows = np.minimum(np.minimum.accumulate(step - cols, axis=1) + cols, over)
+        # Any cell in a candidate's real columns could still lead to a match.
+        live = (rows <= max_distance) & (cols <= ends[:, None])
+        keep = live.any(axis=1)
+        if not keep.all():
+            alive, grid, ends, rows = alive[keep], grid[keep], ends[keep], rows[keep]
+            if not len(alive):
+                return []
+
+    distances = rows[np.arange(len(alive)), ends]
+    hits = distances <= max_distance
+    matches = zip(alive[hits].tolist(), distances[hits].tolist())
+    return sorted(matches, key=lambda item: (item[1], item[0]))
+
+
+def lcs_length(a: Sequence[Any] | str, b: Sequence[Any] | str) -> int:
+    """Length of the longest common subsequence in O(min(n, m)) memory."""
+    a, b = _shorter_last(a, b)
+    m = len(b)
+    row = np.zeros(m + 1, dtype=np.int64)
+    for ch in a:
+        step = np.empty(m + 1, dtype=np.int64)
+        step[0] = 0
+        step[1:] = np.where(b == ch, row[:-1] + 1, row[1:])
+        # cur[j - 1] never exceeds prev[j - 1] + 1, so a running max finishes the row.
+        row = np.maximum.accumulate(step)
+    return int(row[m])
+
+
+def knapsack(weights: Sequence[int], values: Sequence[Any], capacity: int) -> Any:
+    """Best total value of a 0/1 knapsack in O(capacity) memory."""
+    if capacity < 0:
+        raise ValueError("Capacity must be non-negative.")
+    weights = np.asarray(weights, dtype=np.int64)
+    values = np.asarray(values)
+    if weights.shape != values.shape:
+        raise ValueError("Weights and values must have the same length.")
+    if np.any(weights < 0):
+        raise ValueError("Weights must be non-negative.")
+    best = np.zeros(capacity + 1, dtype=np.result_type(values, 0))
+    for weight, value in zip(weights.tolist(), values):
+        if weight == 0:
+            best += max(value, 0)
+        elif weight <= capacity:
+            # The right-hand side is evaluated from the old row, so every item
+            # is used at most once.
+            best[weight:] = np.maximum(best[weight:], best[:-weight] + value)
+    return best[capacity].item()
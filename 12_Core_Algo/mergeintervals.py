@@ -0,0 +1,346 @@
+"""
+Interval merging and an array-backed interval index.
+
+Intervals are closed ``[start, end]`` ranges of numbers or timestamps, e.g.
+scrape windows or chat session spans. ``merge_intervals`` collapses any
+number of them with a sort and a running maximum. ``IntervalIndex`` answers
+point-stabbing and range-overlap queries in batches with binary search, at
+five machine words per interval. Reporting queries search each power-of-two
+length class separately, so one very long interval does not turn every
+query into a linear scan.
+
+Usage:
+    # Check that timestamps are stored and queried exactly
+    python mergeintervals.py
+"""
+
+from __future__ import annotations
+
+from typing import Any, Iterable, Optional
+
+import numpy as np
+
+from BinarySearch import merge_sorted
+from csr_graph import ranges
+
+
+DEFAULT_BUFFER_SIZE = 4096
+# Length class of zero-length intervals; below every frexp exponent.
+ZERO_LENGTH_CLASS = -2048
+
+
+def _as_intervals(starts: Any, ends: Any) -> tuple[np.ndarray, np.ndarray]:
+    starts = np.atleast_1d(np.asarray(starts))
+    ends = np.atleast_1d(np.asarray(ends))
+    if starts.shape != ends.shape or starts.ndim != 1:
+        raise ValueError("Starts and ends must be 1-D arrays of the same length.")
+    if np.any(ends < starts):
+        raise ValueError("Every interval must have start <= end.")
+    return starts, ends
+
+
+def _length_class(starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """Power-of-two class of each interval's length, so lengths in a class differ by < 2x."""
+    lengths = ends - starts
+    if lengths.dtype.kind == "m":
+        lengths = lengths.view(np.int64)
+    _, exponent = np.frexp(lengths.astype(np.float64))
+    return np.where(lengths > 0, exponent, ZERO_LENGTH_CLASS)
+
+
+def merge_intervals(starts: Any, ends: Any) -> tuple[np.ndarray, np.ndarray]:
+    """Merge overlapping or touching intervals; returns sorted, disjoint (starts, ends)."""
+    starts, ends = _as_intervals(starts, ends)
+    if not len(starts):
+        return starts, ends
+    order = np.argsort(starts, kind="stable")
+    starts, ends = starts[order], ends[order]
+    reach = np.maximum.accumulate(ends)
+    opens = np.ones(len(starts), dtype=bool)
+    opens[1:] = starts[1:] > reach[:-1]
+    first = np.flatnonzero(opens)
+    last = np.append(first[1:] - 1, len(starts) - 1)
+    return starts[first], reach[last]
+
+
+class _Run:
+    """
+    Intervals grouped by power-of-two length class and sorted by start within
+    each class, plus all starts and all ends sorted on their own for counting.
+    """
+
+    def __init__(
+        self,
+        starts: np.ndarray,
+        ends_sorted: np.ndarray,
+        classes: np.ndarray,
+        bounds: np.ndarray,
+        group_starts: np.ndarray,
+        group_ends: np.ndarray,
+        ids: np.ndarray,
+        reach: list[Any],
+    ):
+        self.starts = starts
+        self.ends_sorted = ends_sorted
+        self.classes = classes
+        self.bounds = bounds
+        self.group_starts = group_starts
+        self.group_ends = group_ends
+        self.ids = ids
+        # No interval in class c is longer than reach[c], and none is shorter
+        # than half of it, so the candidate scan left of a query stays short.
+        self.reach = reach
+
+    @classmethod
+    def build(cls, starts: np.ndarray, ends: np.ndarray, ids: np.ndarray) -> "_Run":
+        order = np.argsort(starts, kind="stable")
+        starts, ends, ids = starts[order], ends[order], ids[order]
+        classes = _length_class(starts, ends)
+        order = np.argsort(classes, kind="stable")
+        keys, first = np.unique(classes[order], return_index=True)
+        bounds = np.append(first, len(order))
+        group_starts, group_ends = starts[order], ends[order]
+        reach = [
+            (group_ends[a:b] - group_starts[a:b]).max() for a, b in zip(bounds[:-1], bounds[1:])
+        ]
+        return cls(starts, np.sort(ends), keys, bounds, group_starts, group_ends, ids[order], reach)
+
+    def _groups(self) -> dict[int, tuple[slice, Any]]:
+        bounds = self.bounds.tolist()
+        return {
+            key: (slice(a, b), reach)
+            for key, a, b, reach in zip(self.classes.tolist(), bounds[:-1], bounds[1:], self.reach)
+        }
+
+    def merge(self, other: "_Run") -> "_Run":
+        starts, _ = merge_sorted(self.starts, other.starts)
+        ends_sorted, _ = merge_sorted(self.ends_sorted, other.ends_sorted)
+        keys = np.union1d(self.classes, other.classes)
+        mine, theirs = self._groups(), other._groups()
+        parts: list[tuple[np.ndarray, np.ndarray, np.ndarray]] = []
+        reach = []
+        for key in keys.tolist():
+            if key not in theirs or key not in mine:
+                run, (group, longest) = (self, mine[key]) if key in mine else (other, theirs[key])
+                parts.append((run.group_starts[group], run.group_ends[group], run.ids[group]))
+                reach.append(longest)
+                continue
+            (a, reach_a), (b, reach_b) = mine[key], theirs[key]
+            group_starts, take = merge_sorted(self.group_starts[a], other.group_starts[b])
+            group_ends = np.concatenate([self.group_ends[a], other.group_ends[b]])[take]
+            ids = np.concatenate([self.ids[a], other.ids[b]])[take]
+            parts.append((group_starts, group_ends, ids))
+            reach.append(max(reach_a, reach_b))
+        bounds = np.zeros(len(keys) + 1, dtype=np.int64)
+        np.cumsum([len(p[0]) for p in parts], out=bounds[1:])
+        if parts:
+            group_starts, group_ends, ids = (np.concatenate(column) for column in zip(*parts))
+        else:
+            group_starts, group_ends, ids = self.group_starts, self.group_ends, self.ids
+        return _Run(starts, ends_sorted, keys, bounds, group_starts, group_ends, ids, reach)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def count_overlapping(self, lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+        # Intervals starting at or before hi, minus those already over before lo.
+        return (
+            np.searchsorted(self.starts, hi, side="right")
+            - np.searchsorted(self.ends_sorted, lo, side="left")
+        )
+
+    def overlapping(self, lo: np.ndarray, hi: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        owners = [np.empty(0, dtype=np.int64)]
+        ids = [self.ids[:0]]
+        for a, b, reach in zip(self.bounds[:-1], self.bounds[1:], self.reach):
+            starts = self.group_starts[a:b]
+            first = np.searchsorted(starts, lo - reach, side="left")
+            stop = np.searchsorted(starts, hi, side="right")
+            owner, positions = ranges(first, stop)
+            positions += a
+            hit = self.group_ends[positions] >= lo[owner]
+            owners.append(owner[hit])
+            ids.append(self.ids[positions[hit]])
+        return np.concatenate(owners), np.concatenate(ids)
+
+
+class IntervalIndex:
+    """
+    Sorted, array-backed index of closed intervals.
+
+    Intervals are identified by insertion order. New intervals go into a
+    small sorted buffer that is merged into the main arrays once it holds
+    ``buffer_size`` entries, so inserts never re-sort the whole index.
+    Single ``add`` calls are first staged in a plain list and sorted into the
+    buffer as one batch, when it fills up or before the next query. An
+    index created empty takes its dtype from the first intervals inserted,
+    so int64 nanosecond timestamps and datetime64 values are stored exactly.
+    """
+
+    def __init__(
+        self,
+        starts: Optional[Any] = None,
+        ends: Optional[Any] = None,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+    ):
+        if buffer_size <= 0:
+            raise ValueError("Buffer size must be a positive integer.")
+        if starts is None:
+            starts, ends = np.empty(0), np.empty(0)
+        starts, ends = _as_intervals(starts, ends)
+        self.buffer_size = buffer_size
+        self._main = _Run.build(starts, ends, np.arange(len(starts)))
+        self._buffer = _Run.build(starts[:0], ends[:0], np.arange(0))
+        self._next_id = len(starts)
+        # Intervals from add() not yet sorted into the buffer; their ids are
+        # the last len(self._staged) ids handed out.
+        self._staged: list[tuple[Any, Any]] = []
+
+    def __len__(self) -> int:
+        return len(self._main) + len(self._buffer) + len(self._staged)
+
+    def add(self, start: Any, end: Any) -> int:
+        if end < start:
+            raise ValueError("Every interval must have start <= end.")
+        self._staged.append((start, end))
+        self._next_id += 1
+        if len(self._staged) >= self.buffer_size:
+            self._flush_staged()
+        return self._next_id - 1
+
+    def extend(self, starts: Any, ends: Any) -> np.ndarray:
+        """Insert intervals and return their ids."""
+        starts, ends = _as_intervals(starts, ends)
+        self._flush_staged()
+        ids = np.arange(self._next_id, self._next_id + len(starts))
+        self._next_id += len(starts)
+        self._insert(starts, ends, ids)
+        return ids
+
+    def _flush_staged(self) -> None:
+        if not self._staged:
+            return
+        starts, ends = _as_intervals(*zip(*self._staged))
+        ids = np.arange(self._next_id - len(self._staged), self._next_id)
+        self._staged = []
+        self._insert(starts, ends, ids)
+
+    def _insert(self, starts: np.ndarray, ends: np.ndarray, ids: np.ndarray) -> None:
+        if not len(self._main) and not len(self._buffer):
+            # Nothing stored yet, so adopt the dtype of the incoming intervals.
+            self._main = _Run.build(starts[:0], ends[:0], ids[:0])
+            self._buffer = self._main
+        self._buffer = self._buffer.merge(_Run.build(starts, ends, ids))
+        if len(self._buffer) >= self.buffer_size:
+            self.compact()
+
+    def compact(self) -> None:
+        """Merge buffered inserts into the main arrays."""
+        self._flush_staged()
+        if len(self._buffer):
+            self._main = self._main.merge(self._buffer)
+            self._buffer = _Run.build(
+                self._buffer.group_starts[:0], self._buffer.group_ends[:0], self._buffer.ids[:0]
+            )
+
+    def count_overlapping(self, lo: Any, hi: Any) -> np.ndarray:
+        """Number of intervals intersecting each query range ``[lo, hi]``."""
+        lo, hi = _as_intervals(lo, hi)
+        self._flush_staged()
+        return self._main.count_overlapping(lo, hi) + self._buffer.count_overlapping(lo, hi)
+
+    def count_stabbing(self, points: Any) -> np.ndarray:
+        """Number of intervals containing each point."""
+        points = np.atleast_1d(np.asarray(points))
+        return self.count_overlapping(points, points)
+
+    def covers(self, points: Any) -> np.ndarray:
+        return self.count_stabbing(points) > 0
+
+    def overlapping_many(self, lo: Any, hi: Any) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Ids of the intervals intersecting each query range.
+
+        Returns ``(offsets, ids)``: the hits for query ``q`` are
+        ``ids[offsets[q]:offsets[q + 1]]``, sorted by interval id.
+        """
+        lo, hi = _as_intervals(lo, hi)
+        self._flush_staged()
+        owner_main, ids_main = self._main.overlapping(lo, hi)
+        owner_buf, ids_buf = self._buffer.overlapping(lo, hi)
+        owner = np.concatenate([owner_main, owner_buf])
+        ids = np.concatenate([ids_main, ids_buf])
+        order = np.lexsort((ids, owner))
+        offsets = np.zeros(len(lo) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(owner, minlength=len(lo)), out=offsets[1:])
+        return offsets, ids[order]
+
+    def overlapping(self, lo: Any, hi: Any) -> np.ndarray:
+        return self.overlapping_many([lo], [hi])[1]
+
+    def stab(self, point: Any) -> np.ndarray:
+        """Ids of the intervals containing ``point``."""
+        return self.overlapping(point, point)
+
+    def stab_many(self, points: Any) -> tuple[np.ndarray, np.ndarray]:
+        points = np.atleast_1d(np.asarray(points))
+        return self.overlapping_many(points, points)
+
+    def intervals(self) -> tuple[np.ndarray, np.ndarray]:
+        """All intervals as ``(starts, ends)`` indexed by id."""
+        self.compact()
+        main = self._main
+        starts = np.empty_like(main.group_starts)
+        ends = np.empty_like(main.group_ends)
+        starts[main.ids] = main.group_starts
+        ends[main.ids] = main.group_ends
+        return starts, ends
+
+    def merged(self) -> tuple[np.ndarray, np.ndarray]:
+        """Union of all intervals as sorted, disjoint (starts, ends)."""
+        self.compact()
+        return merge_intervals(self._main.group_starts, self._main.group_ends)
+
+
+def merge_interval_lists(intervals: Iterable[tuple[Any, Any]]) -> list[tuple[Any, Any]]:
+    """List-of-pairs convenience wrapper around ``merge_intervals``."""
+    pairs = list(intervals)
+    if not pairs:
+        return []
+    starts, ends = merge_intervals([p[0] for p in pairs], [p[1] for p in pairs])
+    return list(zip(starts.tolist(), ends.tolist()))
+
+
+def _check_exact(
+    index: IntervalIndex, starts: np.ndarray, ends: np.ndarray, tick: Any
+) -> None:
+    stored_starts, stored_ends = index.intervals()
+    if stored_starts.dtype != starts.dtype or not (
+        np.array_equal(stored_starts, starts) and np.array_equal(stored_ends, ends)
+    ):
+        raise AssertionError(f"{starts.dtype} intervals were not stored exactly.")
+    # One tick past the end of an interval must not be reported as inside it.
+    if 0 in index.stab(ends[0] + tick) or 0 not in index.stab(ends[0]):
+        raise AssertionError(f"{starts.dtype} stab is off by a tick at an interval end.")
+
+
+def main() -> None:
+    """Regression checks for indexes built incrementally from empty."""
+    # Epoch nanoseconds are past 2^53, so any float64 round trip loses them.
+    starts = 1_700_000_000_123_456_789 + np.arange(0, 10 ** 6, 1000, dtype=np.int64)
+    ends = starts + 1
+    index = IntervalIndex(buffer_size=64)
+    for start, end in zip(starts.tolist(), ends.tolist()):
+        index.add(start, end)
+    _check_exact(index, starts, ends, 1)
+
+    index = IntervalIndex(buffer_size=64)
+    starts, ends = starts.astype("datetime64[ns]"), ends.astype("datetime64[ns]")
+    for lo in range(0, len(starts), 100):
+        index.extend(starts[lo:lo + 100], ends[lo:lo + 100])
+    _check_exact(index, starts, ends, np.timedelta64(1, "ns"))
+    print("IntervalIndex stores int64 and datetime64 intervals exactly.")
+
+
+if __name__ == "__main__":
+    main()
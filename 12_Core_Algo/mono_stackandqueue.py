@@ -0,0 +1,130 @@
+"""
+Monotonic stack and queue.
+
+A monotonic stack keeps its values sorted from bottom to top by popping every
+entry the incoming value dominates. The same structure answers
+next/previous greater/smaller element queries in one pass, and with eviction
+from the front it becomes the monotonic queue behind the sliding-window
+min/max aggregators in slidingwindow.py.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from typing import Any, Iterable, Optional
+
+import numpy as np
+
+
+NO_INDEX = -1
+VALID_KEEPS = {"min", "max"}
+
+
+class MonotonicStack:
+    """
+    Stack of ``(key, value)`` entries with monotonic values.
+
+    With ``keep="min"`` values increase from bottom to top, so the bottom is
+    the minimum; ``keep="max"`` is the mirror image. An incoming value pops
+    every entry it beats, and also entries it ties when ``pop_equal`` is set.
+    """
+
+    def __init__(self, keep: str = "min", pop_equal: bool = True):
+        if keep not in VALID_KEEPS:
+            raise ValueError(f"keep must be one of {sorted(VALID_KEEPS)}.")
+        self.keep = keep
+        self.pop_equal = pop_equal
+        self._entries: deque[tuple[Any, Any]] = deque()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _dominates(self, new: Any, old: Any) -> bool:
+        if self.keep == "min":
+            return new < old or (self.pop_equal and new == old)
+        return new > old or (self.pop_equal and new == old)
+
+    def pop_dominated(self, value: Any) -> list[Any]:
+        """Pop every entry ``value`` dominates and return their keys, top first."""
+        entries = self._entries
+        popped = []
+        while entries and self._dominates(value, entries[-1][1]):
+            popped.append(entries.pop()[0])
+        return popped
+
+    def append(self, key: Any, value: Any) -> None:
+        self._entries.append((key, value))
+
+    def push(self, key: Any, value: Any) -> list[Any]:
+        popped = self.pop_dominated(value)
+        self._entries.append((key, value))
+        return popped
+
+    def top(self) -> tuple[Any, Any]:
+        return self._entries[-1]
+
+
+class MonotonicQueue(MonotonicStack):
+    """
+    Monotonic stack that also expires entries from the front.
+
+    Keys must be pushed in non-decreasing order (sequence numbers or
+    timestamps). The front entry is the min or max of every live entry.
+    """
+
+    def expire(self, cutoff: Any) -> None:
+        """Drop entries whose key is ``<= cutoff``."""
+        entries = self._entries
+        while entries and entries[0][0] <= cutoff:
+            entries.popleft()
+
+    def front(self) -> tuple[Any, Any]:
+        return self._entries[0]
+
+    @property
+    def best(self) -> Optional[Any]:
+        return self._entries[0][1] if self._entries else None
+
+
+def _next_dominating(values: Iterable[Any], keep: str) -> np.ndarray:
+    values = list(values)
+    result = np.full(len(values), NO_INDEX, dtype=np.int64)
+    stack = MonotonicStack(keep=keep, pop_equal=False)
+    for i, value in enumerate(values):
+        for j in stack.pop_dominated(value):
+            result[j] = i
+        stack.append(i, value)
+    return result
+
+
+def _previous_dominating(values: Iterable[Any], keep: str) -> np.ndarray:
+    values = list(values)
+    result = np.full(len(values), NO_INDEX, dtype=np.int64)
+    # Popping ties too leaves the nearest strictly dominating entry on top.
+    stack = MonotonicStack(keep=keep, pop_equal=True)
+    for i, value in enumerate(values):
+        stack.pop_dominated(value)
+        if len(stack):
+            result[i] = stack.top()[0]
+        stack.append(i, value)
+    return result
+
+
+def next_greater(values: Iterable[Any]) -> np.ndarray:
+    """Index of the next strictly greater element for each position, or -1."""
+    return _next_dominating(values, "max")
+
+
+def next_smaller(values: Iterable[Any]) -> np.ndarray:
+    """Index of the next strictly smaller element for each position, or -1."""
+    return _next_dominating(values, "min")
+
+
+def previous_greater(values: Iterable[Any]) -> np.ndarray:
+    """Index of the previous strictly greater element for each position, or -1."""
+    return _previous_dominating(values, "max")
+
+
+def previous_smaller(values: Iterable[Any]) -> np.ndarray:
+    """Index of the previous strictly smaller element for each position, or -1."""
+    return _previous_dominating(values, "min")
@@ -0,0 +1,287 @@
+"""
+Sliding-window aggregation over streams and arrays.
+
+``SlidingWindow`` consumes an unbounded stream one item at a time and keeps
+rolling count, sum, mean, min and max over either the last ``size`` items or
+the last ``span`` time units. Min and max come from monotonic queues and the
+sum from a two-stack queue, so each item costs O(1) amortized and memory is
+bounded by the window.
+
+``rolling`` and ``rolling_time`` compute the same aggregates over whole NumPy
+arrays at once, e.g. per-second download throughput already in memory.
+
+Sums are never formed by subtracting expired items from a running total:
+with floats, a large value that leaves the window would otherwise take the
+small ones after it down with it, and on an unbounded stream the error only
+grows.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Iterable, Iterator, NamedTuple, Optional
+
+import numpy as np
+
+from mono_stackandqueue import MonotonicQueue
+
+
+VALID_AGGREGATES = {"count", "sum", "mean", "min", "max"}
+
+
+class WindowStats(NamedTuple):
+    count: int
+    sum: Any
+    mean: Optional[float]
+    min: Optional[Any]
+    max: Optional[Any]
+
+
+class SlidingWindow:
+    """
+    Rolling aggregates over a count-based or time-based window.
+
+    Pass ``size`` to keep the last ``size`` items, or ``span`` to keep items
+    whose timestamp lies in ``(now - span, now]``. Timestamps must not
+    decrease.
+    """
+
+    def __init__(self, size: Optional[int] = None, span: Optional[float] = None):
+        if (size is None) == (span is None):
+            raise ValueError("Pass exactly one of size or span.")
+        if size is not None and size <= 0:
+            raise ValueError("Window size must be a positive integer.")
+        if span is not None and span <= 0:
+            raise ValueError("Window span must be positive.")
+        self.size = size
+        self.span = span
+        # Two-stack queue: new items go on the back stack with a running sum;
+        # the front stack holds older items, each with the sum of itself and
+        # every newer front item, rebuilt from the back stack when it empties.
+        self._front: list[tuple[Any, Any]] = []
+        self._back: list[tuple[Any, Any]] = []
+        self._back_sum: Any = 0
+        self._min = MonotonicQueue(keep="min")
+        self._max = MonotonicQueue(keep="max")
+        self._seen = 0
+        self._now: Any = None
+
+    def push(self, value: Any, timestamp: Any = None) -> WindowStats:
+        if self.span is None:
+            key = self._seen
+        else:
+            if timestamp is None:
+                raise ValueError("Time-based windows need a timestamp for every item.")
+            if self._now is not None and timestamp < self._now:
+                raise ValueError("Timestamps must not decrease.")
+            key = timestamp
+        self._seen += 1
+        self._back.append((key, value))
+        self._back_sum += value
+        self._min.push(key, value)
+        self._max.push(key, value)
+        self._advance(key)
+        return self.stats()
+
+    def advance(self, timestamp: Any) -> WindowStats:
+        """Move a time-based window forward without adding an item."""
+        if self.span is None:
+            raise ValueError("Only time-based windows can be advanced.")
+        if self._now is not None and timestamp < self._now:
+            raise ValueError("Timestamps must not decrease.")
+        self._advance(timestamp)
+        return self.stats()
+
+    def _advance(self, key: Any) -> None:
+        self._now = key
+        cutoff = key - (self.size if self.span is None else self.span)
+        while self._front or self._back:
+            if not self._front:
+                self._flip()
+            if self._front[-1][0] > cutoff:
+                break
+            self._front.pop()
+        self._min.expire(cutoff)
+        self._max.expire(cutoff)
+
+    def _flip(self) -> None:
+        # Newest first, so each entry's sum covers itself and everything newer.
+        total: Any = 0
+        for key, value in reversed(self._back):
+            total += value
+            self._front.append((key, total))
+        self._back.clear()
+        self._back_sum = 0
+
+    def consume(self, stream: Iterable[Any]) -> Iterator[WindowStats]:
+        """
+        Push every item of ``stream`` and yield the stats after each one.
+
+        Count-based windows take plain values; time-based windows take
+        ``(timestamp, value)`` pairs.
+        """
+        if self.span is None:
+            for value in stream:
+                yield self.push(value)
+        else:
+            for timestamp, value in stream:
+                yield self.push(value, timestamp)
+
+    def __len__(self) -> int:
+        return len(self._front) + len(self._back)
+
+    @property
+    def count(self) -> int:
+        return len(self)
+
+    @property
+    def sum(self) -> Any:
+        if not self._front:
+            return self._back_sum
+        return self._front[-1][1] + self._back_sum
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.sum / len(self) if len(self) else None
+
+    @property
+    def min(self) -> Optional[Any]:
+        return self._min.best
+
+    @property
+    def max(self) -> Optional[Any]:
+        return self._max.best
+
+    def stats(self) -> WindowStats:
+        return WindowStats(self.count, self.sum, self.mean, self.min, self.max)
+
+
+def _check_aggregate(how: str) -> None:
+    if how not in VALID_AGGREGATES:
+        raise ValueError(f"Aggregate must be one of {sorted(VALID_AGGREGATES)}.")
+
+
+def _rolling_extreme(values: np.ndarray, window: int, how: str) -> np.ndarray:
+    # van Herk / Gil-Werman: split into blocks of `window`, take running
+    # extremes forwards and backwards inside each block, and combine the two
+    # at the window's ends. Three vectorized passes regardless of window size.
+    n = len(values)
+    ufunc = np.minimum if how == "min" else np.maximum
+    if values.dtype.kind == "f":
+        fill = np.inf if how == "min" else -np.inf
+    else:
+        info = np.iinfo(values.dtype)
+        fill = info.max if how == "min" else info.min
+    padded_len = -(-(n + window - 1) // window) * window
+    padded = np.full(padded_len, fill, dtype=values.dtype)
+    padded[window - 1:window - 1 + n] = values
+    blocks = padded.reshape(-1, window)
+    forward = ufunc.accumulate(blocks, axis=1).ravel()
+    backward = ufunc.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].ravel()
+    # Output i covers padded[i : i + window].
+    return ufunc(backward[:n], forward[window - 1:window - 1 + n])
+
+
+def rolling(values: Any, window: int, how: str = "mean") -> np.ndarray:
+    """
+    Aggregate over the last ``window`` items at every position.
+
+    The result has one entry per input, matching ``SlidingWindow(size=window)``:
+    the first ``window - 1`` entries cover the shorter prefix windows.
+    """
+    _check_aggregate(how)
+    if window <= 0:
+        raise ValueError("Window size must be a positive integer.")
+    values = np.asarray(values)
+    n = len(values)
+    if how in ("min", "max"):
+        return _rolling_extreme(values, window, how)
+    stop = np.arange(1, n + 1)
+    counts = np.minimum(stop, window)
+    if how == "count":
+        return counts
+    sums = _window_sums(values, stop - counts, stop)
+    return sums if how == "sum" else sums / counts
+
+
+def _window_sums(values: np.ndarray, start: np.ndarray, stop: np.ndarray) -> np.ndarray:
+    """
+    Sum of ``values[start[i]:stop[i]]`` for every i, from partial sums inside
+    blocks as wide as the widest window.
+
+    A window then either spans two blocks (suffix of one plus prefix of the
+    next) or sits inside one, so rounding error stays relative to values
+    within a window width rather than to a prefix sum over the whole input.
+    """
+    n = len(values)
+    dtype = np.cumsum(values[:0]).dtype
+    if not len(start):
+        return np.empty(0, dtype=dtype)
+    width = max(int((stop - start).max()), 1)
+    padded = np.zeros(-(-n // width) * width, dtype=dtype)
+    padded[:n] = values
+    blocks = padded.reshape(-1, width)
+    forward = np.cumsum(blocks, axis=1).ravel()
+    backward = np.cumsum(blocks[:, ::-1], axis=1)[:, ::-1].ravel()
+    last = stop - 1
+    sums = np.empty(len(start), dtype=dtype)
+    split = start // width != last // width
+    sums[split] = backward[start[split]] + forward[last[split]]
+    inside = np.flatnonzero(~split)
+    first, last = start[inside], last[inside]
+    sums[inside] = forward[last]
+    # Windows strictly inside a block subtract two partial sums of that block.
+    inner = first % width != 0
+    sums[inside[inner]] -= forward[first[inner] - 1]
+    return sums
+
+
+def _sparse_table(values: np.ndarray, ufunc: np.ufunc, depth: int) -> list[np.ndarray]:
+    # Only levels up to `depth` are built; memory is O(n * depth), where depth
+    # is log2 of the widest window rather than of the whole input.
+    table = [values]
+    width = 1
+    while len(table) <= depth and 2 * width <= len(values):
+        prev = table[-1]
+        table.append(ufunc(prev[:-width], prev[width:]))
+        width *= 2
+    return table
+
+
+def rolling_time(timestamps: Any, values: Any, span: float, how: str = "mean") -> np.ndarray:
+    """
+    Aggregate over the items in ``(t - span, t]`` at every timestamp ``t``.
+
+    Timestamps must be sorted. Matches ``SlidingWindow(span=span)`` fed the
+    same ``(timestamp, value)`` pairs.
+    """
+    _check_aggregate(how)
+    if span <= 0:
+        raise ValueError("Window span must be positive.")
+    timestamps = np.asarray(timestamps)
+    values = np.asarray(values)
+    if timestamps.shape != values.shape:
+        raise ValueError("Timestamps and values must have the same shape.")
+    if len(timestamps) and np.any(np.diff(timestamps) < 0):
+        raise ValueError("Timestamps must be sorted.")
+    n = len(values)
+    if n == 0:
+        return values[:0]
+    stop = np.arange(1, n + 1)
+    # Window i holds entries start[i] .. i, which is exactly what the stream
+    # had seen when entry i arrived, even when timestamps repeat.
+    start = np.searchsorted(timestamps, timestamps - span, side="right")
+    counts = stop - start
+    if how == "count":
+        return counts
+    if how in ("sum", "mean"):
+        sums = _window_sums(values, start, stop)
+        return sums if how == "sum" else sums / counts
+    ufunc = np.minimum if how == "min" else np.maximum
+    level = np.floor(np.log2(counts)).astype(np.int64)
+    table = _sparse_table(values, ufunc, int(level.max()))
+    out = np.empty(n, dtype=values.dtype)
+    for k in np.unique(level):
+        rows = np.flatnonzero(level == k)
+        width = 1 << int(k)
+        out[rows] = ufunc(table[k][start[rows]], table[k][stop[rows] - width])
+    return out
@@ -0,0 +1,1129 @@
+#!/usr/bin/env python3
+"""
+Black hole particle simulation, NumPy port of ../blackhole_sim/main.cpp.
+
+Particles are stored as a structure of arrays: contiguous NumPy arrays for
+position, velocity, mass, color and lifetime instead of one object per
+particle. Each step updates every particle with vectorized arithmetic, and
+particles that fall through the event horizon or run out of lifetime are
+removed by compacting the arrays in place. The engine runs headless, so it
+can be profiled on servers without a display; runs can be recorded to disk,
+rasterized offscreen into image sequences and replayed later.
+
+Setup:
+    pip install numpy
+
+Usage:
+    # Step a million particles and report the step rate
+    python main.py --particles 1000000 --steps 200
+
+    # Interacting particles, spread over 8 processes
+    python main.py --particles 200000 --steps 50 --interact --workers 8
+
+    # Record every 10th step, then inspect and render the recording later
+    python main.py --steps 6000 --record runs/orbit --stride 10
+    python main.py --replay runs/orbit --frames-out runs/orbit/frames
+
+    # Same spawn behaviour as the C++ program
+    python main.py --steps 3600
+"""
+
+from __future__ import annotations
+
+import argparse
+import functools
+import json
+import math
+import multiprocessing
+import pathlib
+import struct
+import time
+import zlib
+from multiprocessing import shared_memory
+from typing import Callable, Iterable, Iterator, NamedTuple, Optional
+
+import numpy as np
+
+
+WINDOW_WIDTH = 1200
+WINDOW_HEIGHT = 800
+G = 1000.0  # Gravitational constant (scaled for visualization)
+BLACK_HOLE_MASS = 50000.0
+BLACK_HOLE_RADIUS = 30.0
+EVENT_HORIZON_RADIUS = 50.0
+
+MIN_DISTANCE = 0.1  # Avoid division by zero
+PARTICLE_LIFETIME = 1000.0
+SPAWN_MIN_DISTANCE = 200.0
+SPAWN_DISTANCE_RANGE = 300
+SPEED_RANGE = (50.0, 200.0)
+MASS_RANGE = (1.0, 5.0)
+DEFAULT_PARTICLES = 100
+SPAWN_PROBABILITY = 1.0 / 60.0
+MAX_DT = 0.1  # Cap delta time for stability
+DEFAULT_DT = 1.0 / 60.0
+
+
+def hsv_to_rgb(h: np.ndarray, s: float, v: float) -> np.ndarray:
+    """Vectorized version of ``hsvToRgb``; returns an ``(3, n)`` uint8 array."""
+    h = np.asarray(h, dtype=np.float32)
+    sector = (h / 60.0).astype(np.int64)
+    f = h / 60.0 - sector
+    sector %= 6
+    p = np.full_like(h, v * (1.0 - s))
+    q = v * (1.0 - s * f)
+    t = v * (1.0 - s * (1.0 - f))
+    vv = np.full_like(h, v)
+    # Channel sources for sectors 0-5, as in the C++ switch statement.
+    choices = [
+        (vv, t, p),
+        (q, vv, p),
+        (p, vv, t),
+        (p, q, vv),
+        (t, p, vv),
+        (vv, p, q),
+    ]
+    rgb = np.empty((3, len(h)), dtype=np.uint8)
+    for channel in range(3):
+        rgb[channel] = np.choose(sector, [c[channel] for c in choices]) * 255
+    return rgb
+
+
+class InteractionParams(NamedTuple):
+    cell: float
+    table_mask: int
+    strength: float
+    softening2: float
+    restitution: float
+    collisions: bool
+    dt: float
+
+
+# Large primes for hashing integer cell coordinates into the bucket table.
+HASH_X = 73856093
+HASH_Y = 19349663
+NEIGHBOR_OFFSETS = np.array([(ox, oy) for ox in (-1, 0, 1) for oy in (-1, 0, 1)], dtype=np.int64)
+# Collision radius as a fraction of the drawn radius (2 + mass); keeps every
+# contact distance inside the default cutoff.
+COLLISION_RADIUS_SCALE = 0.5
+DEFAULT_CUTOFF = 8.0
+DEFAULT_SOFTENING = 2.0
+DEFAULT_RESTITUTION = 0.5
+DEFAULT_PAIRS_PER_TASK = 1 << 20
+
+# Shared-memory blocks a pool worker has attached to, by name.
+_attached: dict[str, shared_memory.SharedMemory] = {}
+
+
+def _cell_hash(cx: np.ndarray, cy: np.ndarray, mask: int) -> np.ndarray:
+    return ((cx * HASH_X) ^ (cy * HASH_Y)) & mask
+
+
+def _ranges(lo: np.ndarray, hi: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Concatenate ``arange(lo[i], hi[i])`` for all i, with the owning i of each entry."""
+    # int32 indices halve the memory traffic of the pair gathers below.
+    counts = (hi - lo).astype(np.int32)
+    owner = np.repeat(np.arange(len(lo), dtype=np.int32), counts)
+    run_starts = np.cumsum(counts, dtype=np.int64) - counts
+    positions = np.arange(int(counts.sum()), dtype=np.int32)
+    positions += np.repeat((lo - run_starts).astype(np.int32), counts)
+    return owner, positions
+
+
+def _pair_kernel(
+    state: np.ndarray,
+    bucket_start: np.ndarray,
+    lo: int,
+    hi: int,
+    params: InteractionParams,
+) -> np.ndarray:
+    """
+    Velocity change of particles ``lo .. hi - 1`` from their neighbours.
+
+    ``state`` rows are x, y, vx, vy, mass and radius of every particle, sorted
+    by cell hash so that ``bucket_start`` delimits each bucket. Returns a
+    ``(2, hi - lo)`` array of (dvx, dvy).
+    """
+    x, y, vx, vy, mass, radius = state
+    cx = np.floor(x[lo:hi] / params.cell).astype(np.int64)
+    cy = np.floor(y[lo:hi] / params.cell).astype(np.int64)
+    buckets = np.sort(
+        _cell_hash(
+            cx[:, None] + NEIGHBOR_OFFSETS[:, 0],
+            cy[:, None] + NEIGHBOR_OFFSETS[:, 1],
+            params.table_mask,
+        ),
+        axis=1,
+    )
+    start = bucket_start[buckets]
+    stop = bucket_start[buckets + 1]
+    # Two neighbour cells can hash to the same bucket; visit it only once.
+    repeated = np.zeros(buckets.shape, dtype=bool)
+    repeated[:, 1:] = buckets[:, 1:] == buckets[:, :-1]
+    stop[repeated] = start[repeated]
+    owner, j = _ranges(start.ravel(), stop.ravel())
+    owner //= len(NEIGHBOR_OFFSETS)
+    i = owner + np.int32(lo)
+
+    dx = x[j] - x[i]
+    dy = y[j] - y[i]
+    r2 = dx * dx + dy * dy
+    # Bucket mates from far-away cells (hash collisions) fall outside the
+    # cutoff; the particle itself, and exact overlaps, have r2 == 0 and
+    # exert no force.
+    near = np.flatnonzero((r2 < params.cell * params.cell) & (r2 > 0.0))
+    owner, j, dx, dy, r2 = owner[near], j[near], dx[near], dy[near], r2[near]
+    i = owner + np.int32(lo)
+
+    count = hi - lo
+    # Softened gravity: a_i += G * m_j * d / (r^2 + eps^2)^(3/2).
+    pull = params.strength * params.dt * mass[j] / (r2 + params.softening2) ** 1.5
+    dv = np.empty((2, count), dtype=np.float32)
+    dv[0] = np.bincount(owner, weights=dx * pull, minlength=count)
+    dv[1] = np.bincount(owner, weights=dy * pull, minlength=count)
+
+    if params.collisions:
+        r = np.sqrt(r2)
+        touching = np.flatnonzero(r < radius[i] + radius[j])
+        owner, j, dx, dy, r = owner[touching], j[touching], dx[touching], dy[touching], r[touching]
+        i = owner + np.int32(lo)
+        closing = ((vx[j] - vx[i]) * dx + (vy[j] - vy[i]) * dy) / r
+        approaching = closing < 0.0
+        # Each particle applies only its own side of the impulse; the partner
+        # computes the mirror image, so momentum balances without cross writes.
+        share = (
+            (1.0 + params.restitution) * mass[j] / (mass[i] + mass[j]) * closing / r
+        ) * approaching
+        dv[0] += np.bincount(owner, weights=dx * share, minlength=count).astype(np.float32)
+        dv[1] += np.bincount(owner, weights=dy * share, minlength=count).astype(np.float32)
+    return dv
+
+
+def _attach(name: str, shape: tuple[int, ...], dtype: str) -> np.ndarray:
+    block = _attached.get(name)
+    if block is None:
+        block = shared_memory.SharedMemory(name=name)
+        _attached[name] = block
+    return np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+
+def _release_stale(names: set[str]) -> None:
+    for name in [n for n in _attached if n not in names]:
+        _attached.pop(name).close()
+
+
+def _pair_task(
+    layout: tuple[tuple[str, tuple[int, ...], str], ...],
+    n: int,
+    lo: int,
+    hi: int,
+    params: InteractionParams,
+) -> None:
+    """Pool worker entry: read inputs from and write results to shared memory."""
+    _release_stale({name for name, _, _ in layout})
+    (state_spec, bucket_spec, out_spec) = layout
+    state = _attach(*state_spec)[:, :n]
+    bucket_start = _attach(*bucket_spec)
+    out = _attach(*out_spec)
+    out[:, lo:hi] = _pair_kernel(state, bucket_start, lo, hi, params)
+
+
+class ParticleInteractions:
+    """
+    Particle-particle gravity and collisions through a uniform spatial hash.
+
+    Space is cut into square cells of side ``cutoff``; each cell hashes into
+    a bucket table, and particles are sorted by bucket so that each particle
+    only meets the particles of its 3x3 neighbourhood. Gravity is softened and
+    limited to ``cutoff``; touching particles (half their drawn radius
+    ``2 + mass``) bounce with the given restitution. The work is split into chunks of
+    roughly ``pairs_per_task`` candidate pairs, run on a process pool over
+    shared-memory arrays when ``workers > 1``.
+    """
+
+    def __init__(
+        self,
+        cutoff: float = DEFAULT_CUTOFF,
+        softening: float = DEFAULT_SOFTENING,
+        strength: float = G,
+        restitution: float = DEFAULT_RESTITUTION,
+        collisions: bool = True,
+        workers: int = 1,
+        pairs_per_task: int = DEFAULT_PAIRS_PER_TASK,
+    ):
+        if cutoff <= 0:
+            raise ValueError("Cutoff must be positive.")
+        if workers <= 0:
+            raise ValueError("Worker count must be a positive integer.")
+        self.cutoff = cutoff
+        self.softening = softening
+        self.strength = strength
+        self.restitution = restitution
+        self.collisions = collisions
+        self.workers = workers
+        self.pairs_per_task = pairs_per_task
+        self._pool = None
+        self._blocks: dict[str, shared_memory.SharedMemory] = {}
+        self._capacity = 0
+
+    def __enter__(self) -> "ParticleInteractions":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+        self._free_blocks()
+
+    def _free_blocks(self) -> None:
+        for block in self._blocks.values():
+            block.close()
+            block.unlink()
+        self._blocks = {}
+        self._capacity = 0
+
+    def _buffers(self, capacity: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Sorted-state, bucket and output arrays, in shared memory when pooled."""
+        table = 1 << max(capacity - 1, 1).bit_length()
+        shapes = {
+            "state": ((6, capacity), "float32"),
+            "buckets": ((table + 1,), "int64"),
+            "out": ((2, capacity), "float32"),
+        }
+        if self.workers == 1:
+            return tuple(np.empty(shape, dtype=dtype) for shape, dtype in shapes.values())
+        if capacity > self._capacity:
+            self._free_blocks()
+            for key, (shape, dtype) in shapes.items():
+                size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+                self._blocks[key] = shared_memory.SharedMemory(create=True, size=size)
+            self._capacity = capacity
+            self._shapes = shapes
+        return tuple(
+            np.ndarray(shape, dtype=dtype, buffer=self._blocks[key].buf)
+            for key, (shape, dtype) in self._shapes.items()
+        )
+
+    def _layout(self) -> tuple[tuple[str, tuple[int, ...], str], ...]:
+        return tuple(
+            (self._blocks[key].name, shape, dtype) for key, (shape, dtype) in self._shapes.items()
+        )
+
+    def velocity_change(
+        self,
+        position: np.ndarray,
+        velocity: np.ndarray,
+        mass: np.ndarray,
+        dt: float,
+    ) -> np.ndarray:
+        """Return the ``(2, n)`` velocity change every particle gets from the others."""
+        n = position.shape[1]
+        if n == 0:
+            return np.zeros((2, 0), dtype=np.float32)
+        capacity = max(n, 2 * self._capacity) if n > self._capacity else self._capacity
+        state, bucket_start, out = self._buffers(capacity)
+        table_mask = len(bucket_start) - 2
+
+        cx = np.floor(position[0] / self.cutoff).astype(np.int64)
+        cy = np.floor(position[1] / self.cutoff).astype(np.int64)
+        keys = _cell_hash(cx, cy, table_mask)
+        order = np.argsort(keys, kind="stable")
+        counts = np.bincount(keys, minlength=table_mask + 1)
+        bucket_start[0] = 0
+        np.cumsum(counts, out=bucket_start[1:])
+
+        state = state[:, :n]
+        state[0:2] = position[:, order]
+        state[2:4] = velocity[:, order]
+        state[4] = mass[order]
+        np.add(state[4], 2.0, out=state[5])
+        state[5] *= COLLISION_RADIUS_SCALE
+
+        params = InteractionParams(
+            self.cutoff,
+            table_mask,
+            self.strength,
+            self.softening * self.softening,
+            self.restitution,
+            self.collisions,
+            dt,
+        )
+        # Balance chunks by candidate pairs, estimated from each particle's
+        # own bucket size times the 3x3 neighbourhood.
+        work = np.cumsum(counts[keys[order]] * len(NEIGHBOR_OFFSETS))
+        splits = np.searchsorted(
+            work, np.arange(self.pairs_per_task, int(work[-1]), self.pairs_per_task)
+        )
+        bounds = np.unique(np.concatenate([[0], splits, [n]]))
+        chunks = list(zip(bounds[:-1].tolist(), bounds[1:].tolist()))
+
+        if self.workers == 1:
+            for lo, hi in chunks:
+                out[:, lo:hi] = _pair_kernel(state, bucket_start, lo, hi, params)
+        else:
+            if self._pool is None:
+                self._pool = _pool_context().Pool(self.workers)
+            layout = self._layout()
+            self._pool.starmap(_pair_task, [(layout, n, lo, hi, params) for lo, hi in chunks])
+
+        dv = np.empty((2, n), dtype=np.float32)
+        dv[:, order] = out[:, :n]
+        return dv
+
+
+def _pool_context() -> multiprocessing.context.BaseContext:
+    # Forked workers start instantly and share the parent's imports.
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context()
+
+
+class BlackHoleSimulation:
+    """
+    Particles orbiting a central black hole.
+
+    ``position`` and ``velocity`` are ``(2, capacity)`` arrays (x row, y row);
+    ``ids``, ``mass``, ``lifetime`` and ``max_lifetime`` are ``(capacity,)``
+    and ``color`` is ``(3, capacity)`` uint8. Only the first ``count`` columns
+    are live particles. Ids are unique per spawned particle and follow it
+    through compaction, so recorded trajectories can be traced.
+    """
+
+    def __init__(
+        self,
+        initial_particles: int = DEFAULT_PARTICLES,
+        target_particles: Optional[int] = None,
+        spawn_probability: float = SPAWN_PROBABILITY,
+        spawn_batch: int = 1,
+        seed: Optional[int] = None,
+        interactions: Optional[ParticleInteractions] = None,
+    ):
+        self.black_hole = np.array([WINDOW_WIDTH / 2.0, WINDOW_HEIGHT / 2.0], dtype=np.float32)
+        self.target_particles = (
+            max(initial_particles, DEFAULT_PARTICLES)
+            if target_particles is None
+            else target_particles
+        )
+        self.spawn_probability = spawn_probability
+        self.spawn_batch = spawn_batch
+        self.interactions = interactions
+        self.rng = np.random.default_rng(seed)
+        self.count = 0
+        self.next_id = 0
+        self.steps = 0
+        self.time = 0.0
+        self._allocate(max(initial_particles, self.target_particles, 1))
+        self.spawn(initial_particles)
+
+    def _allocate(self, capacity: int) -> None:
+        old = getattr(self, "position", None)
+        n = self.count
+        ids = np.empty(capacity, dtype=np.int64)
+        position = np.empty((2, capacity), dtype=np.float32)
+        velocity = np.empty((2, capacity), dtype=np.float32)
+        mass = np.empty(capacity, dtype=np.float32)
+        color = np.empty((3, capacity), dtype=np.uint8)
+        lifetime = np.empty(capacity, dtype=np.float32)
+        max_lifetime = np.empty(capacity, dtype=np.float32)
+        if old is not None:
+            ids[:n] = self.ids[:n]
+            position[:, :n] = self.position[:, :n]
+            velocity[:, :n] = self.velocity[:, :n]
+            mass[:n] = self.mass[:n]
+            color[:, :n] = self.color[:, :n]
+            lifetime[:n] = self.lifetime[:n]
+            max_lifetime[:n] = self.max_lifetime[:n]
+        self.ids = ids
+        self.position = position
+        self.velocity = velocity
+        self.mass = mass
+        self.color = color
+        self.lifetime = lifetime
+        self.max_lifetime = max_lifetime
+        # Scratch buffers reused every step so updates allocate nothing.
+        self._scratch = np.empty((4, capacity), dtype=np.float32)
+        self._captured = np.empty(capacity, dtype=bool)
+
+    @property
+    def capacity(self) -> int:
+        return self.position.shape[1]
+
+    def __len__(self) -> int:
+        return self.count
+
+    def spawn(self, k: int = 1) -> None:
+        """Spawn ``k`` particles in a ring around the black hole (``spawnParticle``)."""
+        if k <= 0:
+            return
+        if self.count + k > self.capacity:
+            self._allocate(max(self.count + k, 2 * self.capacity))
+        rng = self.rng
+        angle = rng.uniform(0.0, 2.0 * np.pi, k).astype(np.float32)
+        distance = SPAWN_MIN_DISTANCE + rng.integers(0, SPAWN_DISTANCE_RANGE, k)
+        speed = rng.uniform(*SPEED_RANGE, k)
+        mass = rng.uniform(*MASS_RANGE, k)
+        cos, sin = np.cos(angle), np.sin(angle)
+
+        # Orbital velocity is tangential, plus a radial component for
+        # interesting orbits.
+        radial = rng.uniform(*SPEED_RANGE, k) * 0.3 - 30.0
+        lo, hi = self.count, self.count + k
+        self.ids[lo:hi] = np.arange(self.next_id, self.next_id + k)
+        self.next_id += k
+        self.position[0, lo:hi] = self.black_hole[0] + cos * distance
+        self.position[1, lo:hi] = self.black_hole[1] + sin * distance
+        self.velocity[0, lo:hi] = -sin * speed + cos * radial
+        self.velocity[1, lo:hi] = cos * speed + sin * radial
+        self.mass[lo:hi] = mass
+        # Color based on distance
+        self.color[:, lo:hi] = hsv_to_rgb((distance / 500.0) * 360.0, 0.8, 1.0)
+        self.lifetime[lo:hi] = PARTICLE_LIFETIME
+        self.max_lifetime[lo:hi] = PARTICLE_LIFETIME
+        self.count = hi
+
+    def step(self, dt: float) -> None:
+        """Advance every particle by ``dt`` seconds (``update``)."""
+        dt = min(dt, MAX_DT)
+        n = self.count
+        if n:
+            if self.interactions is not None:
+                self.velocity[:, :n] += self.interactions.velocity_change(
+                    self.position[:, :n], self.velocity[:, :n], self.mass[:n], dt
+                )
+            self._integrate(dt, n)
+            self._compact()
+        if self.count < self.target_particles and self.rng.random() < self.spawn_probability:
+            self.spawn(min(self.spawn_batch, self.target_particles - self.count))
+        self.steps += 1
+        self.time += dt
+
+    def _integrate(self, dt: float, n: int) -> None:
+        x, y = self.position[0, :n], self.position[1, :n]
+        vx, vy = self.velocity[0, :n], self.velocity[1, :n]
+        dx, dy, dist, tmp = (row[:n] for row in self._scratch)
+        captured = self._captured[:n]
+
+        # Calculate gravitational force toward the black hole.
+        np.subtract(self.black_hole[0], x, out=dx)
+        np.subtract(self.black_hole[1], y, out=dy)
+        np.multiply(dx, dx, out=dist)
+        np.multiply(dy, dy, out=tmp)
+        dist += tmp
+        np.sqrt(dist, out=dist)
+        np.maximum(dist, MIN_DISTANCE, out=dist)
+        np.less(dist, EVENT_HORIZON_RADIUS, out=captured)
+
+        # a = G * M / r^2 along the unit vector d / r, so scale d by G*M*dt / r^3.
+        np.multiply(dist, dist, out=tmp)
+        tmp *= dist
+        np.divide(G * BLACK_HOLE_MASS * dt, tmp, out=tmp)
+        dx *= tmp
+        dy *= tmp
+        vx += dx
+        vy += dy
+
+        np.multiply(vx, dt, out=dx)
+        np.multiply(vy, dt, out=dy)
+        x += dx
+        y += dy
+
+        self.lifetime[:n] -= dt
+        # Particles inside the event horizon are gone.
+        self.lifetime[:n][captured] = 0.0
+
+    def _compact(self) -> None:
+        """Drop dead particles by moving live ones from the tail into their slots."""
+        n = self.count
+        alive = self.lifetime[:n] > 0.0
+        k = int(np.count_nonzero(alive))
+        if k == n:
+            return
+        holes = np.flatnonzero(~alive[:k])
+        movers = k + np.flatnonzero(alive[k:])
+        # Only the (few) dead slots below k are rewritten; order is not kept.
+        self.ids[holes] = self.ids[movers]
+        self.position[:, holes] = self.position[:, movers]
+        self.velocity[:, holes] = self.velocity[:, movers]
+        self.mass[holes] = self.mass[movers]
+        self.color[:, holes] = self.color[:, movers]
+        self.lifetime[holes] = self.lifetime[movers]
+        self.max_lifetime[holes] = self.max_lifetime[movers]
+        self.count = k
+
+    def alpha(self) -> np.ndarray:
+        """Fade of every live particle, 0-255, as drawn by the C++ version."""
+        n = self.count
+        return (self.lifetime[:n] / self.max_lifetime[:n] * 255.0).astype(np.uint8)
+
+    def run(
+        self,
+        steps: int,
+        dt: float = DEFAULT_DT,
+        on_step: Optional[Callable[["BlackHoleSimulation"], None]] = None,
+    ) -> None:
+        for _ in range(steps):
+            self.step(dt)
+            if on_step is not None:
+                on_step(self)
+
+
+RECORD_VERSION = 1
+META_FILE = "meta.json"
+PARTICLES_FILE = "particles.bin"
+FRAMES_FILE = "frames.bin"
+# One append-only index record per frame, written right after its particles.
+FRAME_DTYPE = np.dtype([("step", "<i8"), ("time", "<f8"), ("count", "<i8")])
+# Every per-particle field a recording can hold, with its on-disk dtype.
+RECORD_FIELDS = {
+    "id": "<i8",
+    "x": "<f4",
+    "y": "<f4",
+    "vx": "<f4",
+    "vy": "<f4",
+    "mass": "<f4",
+    "lifetime": "<f4",
+    "max_lifetime": "<f4",
+    "r": "u1",
+    "g": "u1",
+    "b": "u1",
+}
+BACKGROUND_COLOR = (5, 5, 15)  # Dark space background
+BLACK_HOLE_COLOR = (20, 20, 30)
+DISK_ALPHA = 100 / 255.0
+DEFAULT_SPLAT_RADIUS = 1
+TRAJECTORY_CHUNK_FRAMES = 256
+
+
+def particle_fields(simulation: BlackHoleSimulation) -> dict[str, np.ndarray]:
+    """Views of every recordable field for the live particles."""
+    n = simulation.count
+    return {
+        "id": simulation.ids[:n],
+        "x": simulation.position[0, :n],
+        "y": simulation.position[1, :n],
+        "vx": simulation.velocity[0, :n],
+        "vy": simulation.velocity[1, :n],
+        "mass": simulation.mass[:n],
+        "lifetime": simulation.lifetime[:n],
+        "max_lifetime": simulation.max_lifetime[:n],
+        "r": simulation.color[0, :n],
+        "g": simulation.color[1, :n],
+        "b": simulation.color[2, :n],
+    }
+
+
+def record_dtype(fields: Iterable[str]) -> np.dtype:
+    return np.dtype([(name, RECORD_FIELDS[name]) for name in fields])
+
+
+class Recorder:
+    """
+    Append particle snapshots to a recording directory.
+
+    Every ``stride``-th call to ``capture`` appends one frame: the chosen
+    fields of all live particles as packed records in ``particles.bin``,
+    then the frame's step, time and particle count to ``frames.bin``. Both
+    files are append-only and flushed per frame, so a run that is killed
+    part way still leaves a readable recording of every completed frame,
+    which ``Recording`` memory-maps back without loading it.
+    """
+
+    def __init__(
+        self,
+        path: str | pathlib.Path,
+        stride: int = 1,
+        fields: Optional[Iterable[str]] = None,
+        dt: Optional[float] = None,
+    ):
+        if stride <= 0:
+            raise ValueError("Stride must be a positive integer.")
+        fields = list(RECORD_FIELDS if fields is None else fields)
+        unknown = [name for name in fields if name not in RECORD_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown record field(s): {', '.join(unknown)}")
+        self.path = pathlib.Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.stride = stride
+        self.fields = fields
+        self.dtype = record_dtype(fields)
+        self.dt = dt
+        self._write_meta()
+        self._file = (self.path / PARTICLES_FILE).open("wb")
+        self._index = (self.path / FRAMES_FILE).open("wb")
+        self._frames = 0
+        self._calls = 0
+
+    def __enter__(self) -> "Recorder":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._frames
+
+    def _write_meta(self) -> None:
+        meta = {
+            "version": RECORD_VERSION,
+            "fields": [[name, RECORD_FIELDS[name]] for name in self.fields],
+            "stride": self.stride,
+            "dt": self.dt,
+            "width": WINDOW_WIDTH,
+            "height": WINDOW_HEIGHT,
+            "black_hole": [WINDOW_WIDTH / 2.0, WINDOW_HEIGHT / 2.0],
+        }
+        (self.path / META_FILE).write_text(json.dumps(meta, indent=2))
+
+    def capture(self, simulation: BlackHoleSimulation) -> bool:
+        """Record the current state if this call falls on the stride; returns True if written."""
+        self._calls += 1
+        if (self._calls - 1) % self.stride:
+            return False
+        source = particle_fields(simulation)
+        frame = np.empty(simulation.count, dtype=self.dtype)
+        for name in self.fields:
+            frame[name] = source[name]
+        frame.tofile(self._file)
+        # Particles reach the file before their index record, so every
+        # indexed frame is complete even if the process dies in between.
+        self._file.flush()
+        entry = np.array([(simulation.steps, simulation.time, simulation.count)], dtype=FRAME_DTYPE)
+        entry.tofile(self._index)
+        self._index.flush()
+        self._frames += 1
+        return True
+
+    def flush(self) -> None:
+        self._file.flush()
+        self._index.flush()
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+            self._index.close()
+
+
+class Recording:
+    """
+    Lazily loaded recording written by ``Recorder``.
+
+    Particle records are memory-mapped, so opening a recording and pulling a
+    single frame or trajectory only touches the pages it needs.
+    """
+
+    def __init__(self, path: str | pathlib.Path):
+        self.path = pathlib.Path(path)
+        self.meta = json.loads((self.path / META_FILE).read_text())
+        if self.meta.get("version") != RECORD_VERSION:
+            raise ValueError(f"Unsupported recording version: {self.meta.get('version')}")
+        self.dtype = np.dtype([tuple(field) for field in self.meta["fields"]])
+        self.fields = [name for name, _ in self.meta["fields"]]
+        # A partially written index record or frame (from a killed run) is
+        # ignored; every frame before it is intact.
+        index = np.fromfile(self.path / FRAMES_FILE, dtype=np.uint8)
+        index = index[:len(index) - len(index) % FRAME_DTYPE.itemsize].view(FRAME_DTYPE)
+        available = (self.path / PARTICLES_FILE).stat().st_size // self.dtype.itemsize
+        offsets = np.concatenate([[0], np.cumsum(index["count"])])
+        frames = int(np.searchsorted(offsets, available, side="right")) - 1
+        self.offsets = offsets[:frames + 1]
+        self.steps = index["step"][:frames]
+        self.times = index["time"][:frames]
+        total = int(self.offsets[-1])
+        if total:
+            self.records = np.memmap(
+                self.path / PARTICLES_FILE, dtype=self.dtype, mode="r", shape=(total,)
+            )
+        else:
+            self.records = np.empty(0, dtype=self.dtype)
+
+    def __len__(self) -> int:
+        return len(self.steps)
+
+    def __getitem__(self, index: int) -> np.ndarray:
+        return self.frame(index)
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        for index in range(len(self)):
+            yield self.frame(index)
+
+    def frame(self, index: int) -> np.ndarray:
+        """Records of every particle in frame ``index`` (a memory-mapped view)."""
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("Frame index out of range.")
+        return self.records[self.offsets[index]:self.offsets[index + 1]]
+
+    def counts(self) -> np.ndarray:
+        """Particle count of every frame."""
+        return np.diff(self.offsets)
+
+    def trajectory(self, particle_id: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Frames in which ``particle_id`` appears and its record in each.
+
+        The records are scanned a chunk of frames at a time, so memory use is
+        bounded regardless of the recording length.
+        """
+        if "id" not in self.fields:
+            raise ValueError("Recording has no particle ids.")
+        frames, rows = [], []
+        for first in range(0, len(self), TRAJECTORY_CHUNK_FRAMES):
+            last = min(first + TRAJECTORY_CHUNK_FRAMES, len(self))
+            lo, hi = int(self.offsets[first]), int(self.offsets[last])
+            hits = lo + np.flatnonzero(self.records["id"][lo:hi] == particle_id)
+            frames.append(np.searchsorted(self.offsets, hits, side="right") - 1)
+            rows.append(self.records[hits])
+        if not frames:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=self.dtype)
+        return np.concatenate(frames), np.concatenate(rows)
+
+    def summary(self) -> dict:
+        counts = self.counts()
+        return {
+            "frames": len(self),
+            "stride": self.meta["stride"],
+            "fields": self.fields,
+            "first_step": int(self.steps[0]) if len(self) else None,
+            "last_step": int(self.steps[-1]) if len(self) else None,
+            "duration": float(self.times[-1] - self.times[0]) if len(self) else 0.0,
+            "particles_min": int(counts.min()) if len(self) else 0,
+            "particles_max": int(counts.max()) if len(self) else 0,
+            "bytes": int(self.records.nbytes),
+        }
+
+
+@functools.lru_cache(maxsize=4)
+def _scene(width: int, height: int, cx: float, cy: float) -> np.ndarray:
+    """Background, accretion disk, event horizon and black hole, as in ``draw``."""
+    ys, xs = np.mgrid[0:height, 0:width].astype(np.float32)
+    dist = np.hypot(xs + 0.5 - cx, ys + 0.5 - cy)
+    image = np.empty((height, width, 3), dtype=np.float32)
+    image[:] = BACKGROUND_COLOR
+    # Draw accretion disk (glowing effect)
+    for i in range(3):
+        disk = dist <= EVENT_HORIZON_RADIUS + i * 10.0
+        color = np.array([100 + i * 20, 50 + i * 10, 150 + i * 30], dtype=np.float32)
+        image[disk] = image[disk] * (1.0 - DISK_ALPHA) + color * DISK_ALPHA
+    image[dist <= EVENT_HORIZON_RADIUS] = 0.0
+    image[dist <= BLACK_HOLE_RADIUS] = BLACK_HOLE_COLOR
+    image.setflags(write=False)
+    return image
+
+
+def _splat_kernel(radius: int) -> list[tuple[int, int, float]]:
+    if radius <= 0:
+        return [(0, 0, 1.0)]
+    sigma2 = (radius / 2.0) ** 2
+    return [
+        (ox, oy, math.exp(-(ox * ox + oy * oy) / (2.0 * sigma2)))
+        for oy in range(-radius, radius + 1)
+        for ox in range(-radius, radius + 1)
+        if ox * ox + oy * oy <= radius * radius
+    ]
+
+
+def rasterize(
+    x: np.ndarray,
+    y: np.ndarray,
+    color: Optional[np.ndarray] = None,
+    alpha: Optional[np.ndarray] = None,
+    width: int = WINDOW_WIDTH,
+    height: int = WINDOW_HEIGHT,
+    splat_radius: int = DEFAULT_SPLAT_RADIUS,
+    black_hole: tuple[float, float] = (WINDOW_WIDTH / 2.0, WINDOW_HEIGHT / 2.0),
+) -> np.ndarray:
+    """
+    Render particles offscreen into an ``(height, width, 3)`` uint8 image.
+
+    ``color`` is ``(3, n)`` 0-255 and ``alpha`` is ``(n,)`` 0-1. Each particle
+    is splatted with a small Gaussian footprint and blended additively, which
+    is order independent and so needs one ``bincount`` per channel and
+    footprint offset rather than a draw call per particle.
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+    if color is None:
+        color = np.full((3, len(x)), 255, dtype=np.uint8)
+    weight = np.ones(len(x), dtype=np.float32) if alpha is None else np.asarray(alpha, np.float32)
+    px = np.rint(x).astype(np.int64)
+    py = np.rint(y).astype(np.int64)
+    channels = np.asarray(color, dtype=np.float32)
+
+    glow = np.zeros((3, height * width), dtype=np.float64)
+    for ox, oy, strength in _splat_kernel(splat_radius):
+        qx, qy = px + ox, py + oy
+        inside = np.flatnonzero((qx >= 0) & (qx < width) & (qy >= 0) & (qy < height))
+        if not len(inside):
+            continue
+        flat = qy[inside] * width + qx[inside]
+        scale = weight[inside] * strength
+        for c in range(3):
+            glow[c] += np.bincount(
+                flat, weights=channels[c, inside] * scale, minlength=height * width
+            )
+
+    image = _scene(width, height, float(black_hole[0]), float(black_hole[1])).copy()
+    image += glow.T.reshape(height, width, 3)
+    return np.clip(image, 0, 255).astype(np.uint8)
+
+
+def render_simulation(simulation: BlackHoleSimulation, **kwargs: object) -> np.ndarray:
+    n = simulation.count
+    return rasterize(
+        simulation.position[0, :n],
+        simulation.position[1, :n],
+        simulation.color[:, :n],
+        simulation.lifetime[:n] / simulation.max_lifetime[:n],
+        **kwargs,
+    )
+
+
+def _require_positions(fields: Iterable[str]) -> None:
+    missing = [name for name in ("x", "y") if name not in fields]
+    if missing:
+        raise ValueError(
+            f"Cannot render frames without position field(s) {', '.join(missing)}; "
+            "include x and y in --fields when recording."
+        )
+
+
+def render_frame(frame: np.ndarray, **kwargs: object) -> np.ndarray:
+    """Rasterize one recorded frame; missing color or lifetime fields fall back to white/opaque."""
+    names = frame.dtype.names
+    _require_positions(names)
+    color = (
+        np.stack([frame["r"], frame["g"], frame["b"]])
+        if {"r", "g", "b"} <= set(names)
+        else None
+    )
+    alpha = (
+        frame["lifetime"] / frame["max_lifetime"]
+        if {"lifetime", "max_lifetime"} <= set(names)
+        else None
+    )
+    return rasterize(frame["x"], frame["y"], color, alpha, **kwargs)
+
+
+def _png_chunk(tag: bytes, data: bytes) -> bytes:
+    return (
+        struct.pack(">I", len(data))
+        + tag
+        + data
+        + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+    )
+
+
+def save_image(path: str | pathlib.Path, image: np.ndarray) -> pathlib.Path:
+    """Write an RGB uint8 image as .png or .ppm using only the standard library."""
+    path = pathlib.Path(path)
+    height, width, _ = image.shape
+    if path.suffix.lower() == ".ppm":
+        with path.open("wb") as fh:
+            fh.write(f"P6 {width} {height} 255\n".encode("ascii"))
+            fh.write(np.ascontiguousarray(image).tobytes())
+        return path
+    if path.suffix.lower() != ".png":
+        raise ValueError("Frames can be written as .png or .ppm.")
+    # Every scanline starts with filter type 0 (none).
+    rows = np.zeros((height, width * 3 + 1), dtype=np.uint8)
+    rows[:, 1:] = image.reshape(height, width * 3)
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    with path.open("wb") as fh:
+        fh.write(b"\x89PNG\r\n\x1a\n")
+        fh.write(_png_chunk(b"IHDR", header))
+        fh.write(_png_chunk(b"IDAT", zlib.compress(rows.tobytes(), 6)))
+        fh.write(_png_chunk(b"IEND", b""))
+    return path
+
+
+def frame_filename(step: int, image_format: str) -> str:
+    return f"frame_{step:06d}.{image_format}"
+
+
+def export_frames(
+    recording: Recording,
+    output: str | pathlib.Path,
+    every: int = 1,
+    image_format: str = "png",
+    **kwargs: object,
+) -> int:
+    """
+    Rasterize every ``every``-th frame of a recording into an image sequence.
+
+    Files are named by simulation step, like the frames ``main`` renders live
+    with ``--frames-out``, so both paths give the same names for one run.
+    """
+    _require_positions(recording.fields)
+    output = pathlib.Path(output)
+    output.mkdir(parents=True, exist_ok=True)
+    written = 0
+    for index in range(0, len(recording), every):
+        image = render_frame(recording.frame(index), **kwargs)
+        save_image(output / frame_filename(int(recording.steps[index]), image_format), image)
+        written += 1
+    return written
+
+
+def parse_args(argv: Optional[Iterable[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Headless NumPy black hole particle simulation."
+    )
+    parser.add_argument(
+        "--particles",
+        type=int,
+        default=DEFAULT_PARTICLES,
+        help="Particles spawned at start and kept topped up (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--steps",
+        type=int,
+        default=600,
+        help="Number of steps to simulate (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--dt",
+        type=float,
+        default=DEFAULT_DT,
+        help=f"Seconds per step, capped at {MAX_DT} (default: 1/60)",
+    )
+    parser.add_argument(
+        "--spawn-batch",
+        type=int,
+        default=1,
+        help="Particles spawned when a respawn triggers (default: 1)",
+    )
+    parser.add_argument(
+        "--interact",
+        action="store_true",
+        help="Enable particle-particle gravity and collisions",
+    )
+    parser.add_argument(
+        "--cutoff",
+        type=float,
+        default=DEFAULT_CUTOFF,
+        help="Interaction range and spatial-hash cell size (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Processes used for particle interactions (default: 1)",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="Random seed (default: random)",
+    )
+    parser.add_argument(
+        "--record",
+        type=pathlib.Path,
+        help="Directory to record particle snapshots into",
+    )
+    parser.add_argument(
+        "--stride",
+        type=int,
+        default=1,
+        help="Record (and render) every Nth step (default: 1)",
+    )
+    parser.add_argument(
+        "--fields",
+        default=",".join(RECORD_FIELDS),
+        help="Comma-separated particle fields to record (default: all)",
+    )
+    parser.add_argument(
+        "--frames-out",
+        type=pathlib.Path,
+        help="Directory to rasterize frames into",
+    )
+    parser.add_argument(
+        "--image-format",
+        choices=["png", "ppm"],
+        default="png",
+        help="Image format for rasterized frames (default: png)",
+    )
+    parser.add_argument(
+        "--splat-radius",
+        type=int,
+        default=DEFAULT_SPLAT_RADIUS,
+        help="Particle footprint radius in pixels (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--replay",
+        type=pathlib.Path,
+        help="Inspect an existing recording (and render it with --frames-out) "
+        "instead of simulating",
+    )
+    return parser.parse_args(argv)
+
+
+def replay(args: argparse.Namespace) -> None:
+    recording = Recording(args.replay)
+    for key, value in recording.summary().items():
+        print(f"{key}: {value}")
+    if args.frames_out:
+        written = export_frames(
+            recording,
+            args.frames_out,
+            image_format=args.image_format,
+            splat_radius=args.splat_radius,
+        )
+        print(f"Wrote {written} frames to {args.frames_out}")
+
+
+def main(argv: Optional[Iterable[str]] = None) -> None:
+    args = parse_args(argv)
+    if args.replay:
+        replay(args)
+        return
+
+    interactions = (
+        ParticleInteractions(cutoff=args.cutoff, workers=args.workers) if args.interact else None
+    )
+    simulation = BlackHoleSimulation(
+        initial_particles=args.particles,
+        target_particles=args.particles,
+        spawn_batch=args.spawn_batch,
+        seed=args.seed,
+        interactions=interactions,
+    )
+    recorder = (
+        Recorder(args.record, stride=args.stride, fields=args.fields.split(","), dt=args.dt)
+        if args.record
+        else None
+    )
+    if args.frames_out:
+        args.frames_out.mkdir(parents=True, exist_ok=True)
+
+    def capture(sim: BlackHoleSimulation) -> None:
+        if recorder is not None:
+            recorder.capture(sim)
+        if args.frames_out and sim.steps % args.stride == 0:
+            image = render_simulation(sim, splat_radius=args.splat_radius)
+            save_image(args.frames_out / frame_filename(sim.steps, args.image_format), image)
+
+    start = time.perf_counter()
+    try:
+        capture(simulation)
+        simulation.run(args.steps, args.dt, on_step=capture)
+    finally:
+        if interactions is not None:
+            interactions.close()
+        if recorder is not None:
+            recorder.close()
+    elapsed = time.perf_counter() - start
+    rate = args.steps / elapsed if elapsed > 0 else float("inf")
+    print(
+        f"{args.steps} steps in {elapsed:.2f}s ({rate:.1f} steps/s), "
+        f"{simulation.count} particles remaining"
+    )
+
+
+if __name__ == "__main__":
+    main()